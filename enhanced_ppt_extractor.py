@@ -6,38 +6,260 @@
 """
 
 import os
+import re
+import struct
+import sys
+import threading
 import zipfile
 import xml.etree.ElementTree as ET
 import json
+from collections import defaultdict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from file_type_detector import FileTypeDetector
-from error_handler import ErrorHandler
+from error_handler import ErrorHandler, check_disk_space
+
+# JSON序列化：优先用C实现的orjson；整块bytes经os.write一次写出，
+# 跳过文本模式包装层的逐字符UTF-8编码
+try:
+    import orjson
+    
+    def _dump_json_bytes(obj, pretty):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    def _dump_json_bytes(obj, pretty):
+        return json.dumps(obj, ensure_ascii=False,
+                          indent=2 if pretty else None,
+                          separators=None if pretty else (',', ':')).encode('utf-8')
+
+# 智能命名的类型到前缀映射（dict查表代替逐项if/elif链）
+_NAME_RULES = {
+    'Microsoft Word Document': 'Word文档',
+    'Microsoft Excel Worksheet': 'Excel表格',
+    'Microsoft PowerPoint Presentation': 'PPT演示文稿',
+}
+_IMAGE_RE = re.compile(r'image', re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class ExtractedFile:
+    """单个提取结果记录（slots对象比6键dict省约一半内存）"""
+    original_path: str
+    output_path: str
+    output_filename: str
+    original_name: str
+    file_type: str
+    file_size: int
+
+
+@dataclass(slots=True)
+class FailedFile:
+    """单个失败记录"""
+    file: str
+    error: str
+
 
 class EnhancedPPTExtractor:
-    def __init__(self, output_dir="extracted_objects_enhanced"):
+    # 检测器无状态（只持有签名表），全部实例共享一份，省去重复建表
+    _shared_detector = None
+    
+    def __init__(self, output_dir="extracted_objects_enhanced", max_cache_bytes=64 * 1024 * 1024,
+                 verbose=False):
         self.output_dir = output_dir
-        self.file_detector = FileTypeDetector()
-        self.error_handler = ErrorHandler()
+        if EnhancedPPTExtractor._shared_detector is None:
+            EnhancedPPTExtractor._shared_detector = FileTypeDetector()
+        self.file_detector = EnhancedPPTExtractor._shared_detector
+        # ErrorHandler惰性创建：只建映射模板的调用路径用不到日志装配
+        self._error_handler = None
+        # 逐文件的进度输出默认走logger.debug：热循环中每行print都会触发
+        # 一次stdout刷新系统调用，嵌入对象很多时开销可观
+        self.verbose = verbose
         self.extracted_files = []
         self.failed_files = []
         
+        # 嵌入对象缓存：模板创建阶段已解压的内容在提取阶段直接复用，
+        # "模板→填写→提取"流程中每个条目只解压一次
+        self.max_cache_bytes = max_cache_bytes
+        self._emb_cache = {}
+        self._emb_cache_bytes = 0
+        self._emb_list = None
+        self._emb_list_key = None
+        self._cache_lock = threading.Lock()
+        
         # 创建输出目录
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # 已占用的输出文件名集合（启动时listdir一次），
+        # 重名冲突全部在内存中解决，避免每个候选名都stat一次磁盘
+        self._taken_names = set(os.listdir(self.output_dir))
+        self._names_lock = threading.Lock()
+        # 输出路径前缀拼接一次，热循环里用字符串相加代替os.path.join
+        self._out_prefix = self.output_dir + os.sep
+    
+    def _open_unique(self, base, ext, sep='_'):
+        """
+        以O_EXCL原子创建一个不重名的输出文件，返回(fd, 文件名)
+        内存集合给出起始候选名；O_EXCL把查重与建文件合并为一次系统调用，
+        同时兜底多进程共享输出目录时的竞态
+        """
+        with self._names_lock:
+            candidate = f"{base}{ext}"
+            i = 1
+            while True:
+                if candidate not in self._taken_names:
+                    try:
+                        fd = os.open(self._out_prefix + candidate,
+                                     os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                        self._taken_names.add(candidate)
+                        return fd, candidate
+                    except FileExistsError:
+                        # 其他进程抢先创建了同名文件，登记后换下一个候选名
+                        self._taken_names.add(candidate)
+                candidate = f"{base}{sep}{i}{ext}"
+                i += 1
+    
+    @property
+    def error_handler(self):
+        if self._error_handler is None:
+            self._error_handler = ErrorHandler()
+        return self._error_handler
     
-    def create_filename_mapping_template(self, ppt_file):
+    @property
+    def logger(self):
+        return self.error_handler.logger
+    
+    def _get_embedding_files(self, zip_ref):
+        """
+        过滤嵌入对象条目，结果按(文件路径, mtime)缓存在实例上
+        OOXML规定嵌入对象位于ppt/embeddings/，优先用startswith精确命中；
+        未命中时退回一次大小写无关的子串扫描，兼容非标准打包
+        """
+        source = zip_ref.filename
+        key = (source, os.path.getmtime(source)) if source else None
+        if self._emb_list is None or self._emb_list_key != key:
+            infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+            names = [info.filename for info in infos
+                     if info.filename.startswith('ppt/embeddings/')]
+            if not names:
+                names = [info.filename for info in infos
+                         if 'embeddings' in info.filename.lower()]
+            self._emb_list = names
+            self._emb_list_key = key
+        return self._emb_list
+    
+    def _read_embedding(self, zip_ref, emb_file):
+        """
+        读取嵌入对象内容，命中缓存时不再重复解压
+        """
+        file_content = self._emb_cache.get(emb_file)
+        if file_content is None:
+            file_content = zip_ref.read(emb_file)
+            with self._cache_lock:
+                if self._emb_cache_bytes + len(file_content) <= self.max_cache_bytes:
+                    self._emb_cache[emb_file] = file_content
+                    self._emb_cache_bytes += len(file_content)
+        return file_content
+    
+    def _detect_embedding_type(self, zip_ref, emb_file):
+        """
+        类型检测只读取条目头部512字节（魔数检测只需前缀），
+        不再为嗅探类型而解压整个对象
+        """
+        cached = self._emb_cache.get(emb_file)
+        if cached is not None:
+            return self.file_detector.detect_file_type(cached)
+        with zip_ref.open(emb_file) as fp:
+            header = fp.read(512)
+        # ZIP容器（docx/xlsx等）的子类型判定需要读到中央目录，退回完整读取；
+        # 其余格式仅凭头部魔数即可判定
+        if header.startswith(b'PK\x03\x04'):
+            return self.file_detector.detect_file_type(self._read_embedding(zip_ref, emb_file))
+        return self.file_detector.detect_file_type(header)
+    
+    def _sendfile_stored(self, archive_path, info, dst_fd):
+        """
+        未压缩(ZIP_STORED)条目用os.sendfile在内核内直接拷贝，
+        数据不经过用户态缓冲区
+        """
+        src_fd = os.open(archive_path, os.O_RDONLY)
+        try:
+            # 本地文件头：30字节定长 + 文件名 + 扩展字段（长度以本地头为准，可能与中央目录不同）
+            os.lseek(src_fd, info.header_offset + 26, os.SEEK_SET)
+            name_len, extra_len = struct.unpack('<HH', os.read(src_fd, 4))
+            offset = info.header_offset + 30 + name_len + extra_len
+            remaining = info.file_size
+            while remaining > 0:
+                sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if sent == 0:
+                    raise OSError("sendfile提前结束")
+                offset += sent
+                remaining -= sent
+        finally:
+            os.close(src_fd)
+        return info.file_size
+    
+    def _write_embedding(self, zip_ref, emb_file, fd):
+        """
+        把嵌入对象写入_open_unique打开的fd并返回字节数（fd在此关闭）
+        缓存命中时整块直写；未压缩条目走sendfile零拷贝；
+        其余以64KiB块流式拷贝，避免整块载入内存
+        """
+        try:
+            cached = self._emb_cache.get(emb_file)
+            if cached is not None:
+                view = memoryview(cached)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+                return len(cached)
+            
+            info = zip_ref.getinfo(emb_file)
+            if (info.compress_type == zipfile.ZIP_STORED and zip_ref.filename
+                    and hasattr(os, 'sendfile')):
+                try:
+                    return self._sendfile_stored(zip_ref.filename, info, fd)
+                except OSError:
+                    pass  # 文件系统不支持sendfile时退回普通拷贝
+            
+            with zip_ref.open(emb_file) as src:
+                while True:
+                    chunk = src.read(64 * 1024)
+                    if not chunk:
+                        break
+                    os.write(fd, chunk)
+            return info.file_size
+        finally:
+            os.close(fd)
+    
+    @contextmanager
+    def _open_ppt(self, ppt_file, zip_ref=None):
+        """
+        复用外部传入的已打开ZipFile句柄；未传入时自行打开
+        多个提取阶段共享同一句柄可以避免重复扫描ZIP中央目录
+        自行打开时底层文件套1MiB大缓冲：中央目录扫描和大量小条目的
+        局部文件头读取会合并成少量大块读
+        """
+        if zip_ref is not None:
+            yield zip_ref
+            return
+        with open(ppt_file, 'rb', buffering=1 << 20) as fp, zipfile.ZipFile(fp) as zf:
+            yield zf
+    
+    def create_filename_mapping_template(self, ppt_file, zip_ref=None, pretty=True):
         """
         创建文件名映射模板，用户可以手动填写原始文件名
+        pretty=False时输出紧凑JSON（机器回读场景序列化快约一倍）
         """
         print(f"\n=== 创建文件名映射模板 ===")
         
         mapping_file = f"{Path(ppt_file).stem}_filename_mapping.json"
         
         try:
-            with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
-                file_list = zip_ref.namelist()
-                
-                # 查找所有嵌入对象
-                embedding_files = [f for f in file_list if 'embeddings' in f.lower()]
+            with self._open_ppt(ppt_file, zip_ref) as zip_ref:
+                # 查找所有嵌入对象（结果缓存在实例上）
+                embedding_files = self._get_embedding_files(zip_ref)
                 
                 # 创建映射模板
                 mapping_template = {
@@ -47,10 +269,9 @@ class EnhancedPPTExtractor:
                 }
                 
                 for i, emb_file in enumerate(embedding_files):
-                    # 检测文件类型
+                    # 检测文件类型（只嗅探头部，不解压整个对象）
                     try:
-                        file_content = zip_ref.read(emb_file)
-                        file_type_info = self.file_detector.detect_file_type(file_content)
+                        file_type_info = self._detect_embedding_type(zip_ref, emb_file)
                         
                         mapping_entry = {
                             "index": i + 1,
@@ -67,9 +288,13 @@ class EnhancedPPTExtractor:
                     except Exception as e:
                         print(f"处理文件 {emb_file} 时出错: {e}")
                 
-                # 保存映射模板
-                with open(mapping_file, 'w', encoding='utf-8') as f:
-                    json.dump(mapping_template, f, ensure_ascii=False, indent=2)
+                # 保存映射模板（整块bytes一次写出）
+                payload = _dump_json_bytes(mapping_template, pretty)
+                fd = os.open(mapping_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, payload)
+                finally:
+                    os.close(fd)
                 
                 print(f"\n文件名映射模板已创建: {mapping_file}")
                 print(f"找到 {len(mapping_template['mappings'])} 个嵌入对象")
@@ -81,7 +306,7 @@ class EnhancedPPTExtractor:
             print(f"创建映射模板失败: {e}")
             return None
     
-    def extract_with_mapping(self, ppt_file, mapping_file):
+    def extract_with_mapping(self, ppt_file, mapping_file, zip_ref=None):
         """
         使用文件名映射提取嵌入对象
         """
@@ -99,17 +324,32 @@ class EnhancedPPTExtractor:
             print(f"读取映射文件: {mapping_file}")
             print(f"映射条目数: {len(mapping_data['mappings'])}")
             
-            with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
-                for mapping in mapping_data['mappings']:
-                    embedded_path = mapping['embedded_path']
+            with self._open_ppt(ppt_file, zip_ref) as open_zip:
+                # 提取前按ZipInfo汇总解压后总字节数，一次性校验磁盘空间，
+                # 避免写到一半才因空间不足失败
+                total_bytes = 0
+                for m in mapping_data['mappings']:
+                    try:
+                        total_bytes += open_zip.getinfo(m['embedded_path']).file_size
+                    except KeyError:
+                        pass
+                check_disk_space(self.output_dir, total_bytes)
+                
+                # 各条目互相独立（zlib解压时释放GIL），线程池重叠解压与磁盘写入；
+                # 结果记录在锁内串行完成
+                state_lock = threading.Lock()
+                
+                def extract_one(mapping):
+                    # 条目字段在循环体内会被多次引用，统一在此取出一次；
+                    # intern：路径共享ppt/embeddings/前缀、类型标签取值有限，
+                    # 驻留后上千条记录只持有同一份字符串对象
+                    embedded_path = sys.intern(mapping['embedded_path'])
                     original_name = mapping.get('original_name', '').strip()
                     detected_extension = mapping['detected_extension']
+                    detected_type = mapping['detected_type']
                     current_name = mapping['current_name']
                     
                     try:
-                        # 读取文件内容
-                        file_content = zip_ref.read(embedded_path)
-                        
                         # 确定输出文件名
                         if original_name:
                             # 使用用户提供的原始名称
@@ -120,45 +360,48 @@ class EnhancedPPTExtractor:
                         else:
                             # 使用当前名称或生成描述性名称
                             if current_name.endswith('.bin'):
-                                base_name = Path(current_name).stem
+                                base_name = os.path.splitext(current_name)[0]
                                 output_filename = f"{base_name}{detected_extension}"
                             else:
                                 output_filename = current_name
                         
-                        # 处理重名文件
-                        output_path = os.path.join(self.output_dir, output_filename)
-                        counter = 1
-                        while os.path.exists(output_path):
-                            name_part = Path(output_filename).stem
-                            ext_part = Path(output_filename).suffix
-                            output_filename = f"{name_part}_{counter}{ext_part}"
-                            output_path = os.path.join(self.output_dir, output_filename)
-                            counter += 1
+                        # 处理重名文件（O_EXCL原子建文件，查重与创建合并为一次系统调用）
+                        # splitext只做一次：Path对象构造/解析比C层字符串切分贵得多
+                        name_part, ext_part = os.path.splitext(output_filename)
+                        fd, output_filename = self._open_unique(name_part, ext_part)
+                        output_path = self._out_prefix + output_filename
                         
-                        # 保存文件
-                        with open(output_path, 'wb') as output_file:
-                            output_file.write(file_content)
+                        # 保存文件（流式写出，模板阶段已解压的条目直接命中缓存）
+                        file_size = self._write_embedding(open_zip, embedded_path, fd)
                         
                         # 记录成功提取的文件
-                        file_info = {
-                            'original_path': embedded_path,
-                            'output_path': output_path,
-                            'output_filename': output_filename,
-                            'original_name': original_name if original_name else "未指定",
-                            'file_type': mapping['detected_type'],
-                            'file_size': len(file_content)
-                        }
+                        file_info = ExtractedFile(
+                            original_path=embedded_path,
+                            output_path=output_path,
+                            output_filename=output_filename,
+                            original_name=original_name if original_name else "未指定",
+                            file_type=sys.intern(detected_type),
+                            file_size=file_size
+                        )
                         
-                        self.extracted_files.append(file_info)
-                        print(f"✓ 提取成功: {output_filename} (原始名称: {file_info['original_name']})")
+                        with state_lock:
+                            self.extracted_files.append(file_info)
+                            if self.verbose:
+                                print(f"✓ 提取成功: {output_filename} (原始名称: {file_info.original_name})")
+                            else:
+                                self.logger.debug(f"提取成功: {output_filename}")
                         
                     except Exception as e:
-                        error_info = {
-                            'file': embedded_path,
-                            'error': str(e)
-                        }
-                        self.failed_files.append(error_info)
-                        print(f"✗ 提取失败: {embedded_path} - {e}")
+                        error_info = FailedFile(file=embedded_path, error=str(e))
+                        with state_lock:
+                            self.failed_files.append(error_info)
+                            if self.verbose:
+                                print(f"✗ 提取失败: {embedded_path} - {e}")
+                            else:
+                                self.logger.debug(f"提取失败: {embedded_path} - {e}")
+                
+                with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+                    list(pool.map(extract_one, mapping_data['mappings']))
             
             self.print_extraction_report()
             return True
@@ -167,81 +410,83 @@ class EnhancedPPTExtractor:
             print(f"使用映射文件提取失败: {e}")
             return False
     
-    def extract_with_smart_naming(self, ppt_file):
+    def extract_with_smart_naming(self, ppt_file, zip_ref=None):
         """
         使用智能命名策略提取嵌入对象
         """
         print(f"\n=== 使用智能命名策略提取嵌入对象 ===")
         
         try:
-            with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
-                file_list = zip_ref.namelist()
-                embedding_files = [f for f in file_list if 'embeddings' in f.lower()]
+            with self._open_ppt(ppt_file, zip_ref) as zip_ref:
+                embedding_files = self._get_embedding_files(zip_ref)
                 
                 print(f"找到 {len(embedding_files)} 个嵌入对象")
                 
-                # 按文件类型分组计数
-                type_counters = {}
+                # 提取前一次性校验磁盘空间
+                total_bytes = sum(zip_ref.getinfo(name).file_size for name in embedding_files)
+                check_disk_space(self.output_dir, total_bytes)
+                
+                # 阶段1：并行类型检测（只嗅探头部；各条目互相独立，解压时释放GIL）
+                def detect_one(emb_file):
+                    try:
+                        return self._detect_embedding_type(zip_ref, emb_file), None
+                    except Exception as e:
+                        return None, e
+                
+                with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+                    detect_results = list(pool.map(detect_one, embedding_files))
+                
+                # 阶段2：按原顺序命名并写出（命名依赖类型计数器，保持确定性顺序）
+                # 按文件类型分组计数（defaultdict免去每次的in判断）
+                type_counters = defaultdict(int)
                 
-                for emb_file in embedding_files:
+                for emb_file, (file_type_info, detect_error) in zip(embedding_files, detect_results):
+                    emb_file = sys.intern(emb_file)
                     try:
-                        file_content = zip_ref.read(emb_file)
-                        file_type_info = self.file_detector.detect_file_type(file_content)
-                        file_type = file_type_info['type']
+                        if detect_error is not None:
+                            raise detect_error
+                        # 类型标签取值有限，驻留后全部记录共享同一字符串对象
+                        file_type = sys.intern(file_type_info['type'])
                         extension = file_type_info['extension']
                         
                         # 智能命名策略
-                        if file_type not in type_counters:
-                            type_counters[file_type] = 1
-                        else:
-                            type_counters[file_type] += 1
-                        
-                        # 生成智能文件名
-                        if file_type == 'Microsoft Word Document':
-                            base_name = f"Word文档_{type_counters[file_type]:02d}"
-                        elif file_type == 'Microsoft Excel Worksheet':
-                            base_name = f"Excel表格_{type_counters[file_type]:02d}"
-                        elif file_type == 'Microsoft PowerPoint Presentation':
-                            base_name = f"PPT演示文稿_{type_counters[file_type]:02d}"
-                        elif 'image' in file_type.lower():
-                            base_name = f"图片_{type_counters[file_type]:02d}"
-                        else:
-                            base_name = f"{file_type}_{type_counters[file_type]:02d}"
+                        type_counters[file_type] += 1
                         
-                        output_filename = f"{base_name}{extension}"
+                        # 生成智能文件名（查表命中前缀，图片类兜底用预编译正则）
+                        base_prefix = _NAME_RULES.get(file_type) or (
+                            '图片' if _IMAGE_RE.search(file_type) else file_type)
+                        base_name = f"{base_prefix}_{type_counters[file_type]:02d}"
                         
-                        # 处理重名文件
-                        output_path = os.path.join(self.output_dir, output_filename)
-                        counter = 1
-                        while os.path.exists(output_path):
-                            output_filename = f"{base_name}_副本{counter}{extension}"
-                            output_path = os.path.join(self.output_dir, output_filename)
-                            counter += 1
+                        # 处理重名文件（O_EXCL原子建文件，查重与创建合并为一次系统调用）
+                        fd, output_filename = self._open_unique(base_name, extension, sep='_副本')
+                        output_path = self._out_prefix + output_filename
                         
-                        # 保存文件
-                        with open(output_path, 'wb') as output_file:
-                            output_file.write(file_content)
+                        # 保存文件（流式写出）
+                        file_size = self._write_embedding(zip_ref, emb_file, fd)
                         
                         # 记录成功提取的文件
-                        file_info = {
-                            'original_path': emb_file,
-                            'output_path': output_path,
-                            'output_filename': output_filename,
-                            'original_name': "智能命名",
-                            'file_type': file_type,
-                            'file_size': len(file_content)
-                        }
+                        file_info = ExtractedFile(
+                            original_path=emb_file,
+                            output_path=output_path,
+                            output_filename=output_filename,
+                            original_name="智能命名",
+                            file_type=file_type,
+                            file_size=file_size
+                        )
                         
                         self.extracted_files.append(file_info)
-                        print(f"✓ 提取成功: {output_filename}")
+                        if self.verbose:
+                            print(f"✓ 提取成功: {output_filename}")
+                        else:
+                            self.logger.debug(f"提取成功: {output_filename}")
                         
                     except Exception as e:
-                        error_info = {
-                            'file': emb_file,
-                            'error': str(e)
-                        }
+                        error_info = FailedFile(file=emb_file, error=str(e))
                         self.failed_files.append(error_info)
-                        print(f"✗ 提取失败: {emb_file} - {e}")
+                        if self.verbose:
+                            print(f"✗ 提取失败: {emb_file} - {e}")
+                        else:
+                            self.logger.debug(f"提取失败: {emb_file} - {e}")
                 
                 self.print_extraction_report()
                 return True
@@ -262,14 +507,14 @@ class EnhancedPPTExtractor:
         if self.extracted_files:
             print("\n成功提取的文件:")
             for file_info in self.extracted_files:
-                print(f"  {file_info['output_filename']} ({file_info['file_type']}, {file_info['file_size']} bytes)")
-                if file_info['original_name'] != "智能命名" and file_info['original_name'] != "未指定":
-                    print(f"    原始名称: {file_info['original_name']}")
+                print(f"  {file_info.output_filename} ({file_info.file_type}, {file_info.file_size} bytes)")
+                if file_info.original_name != "智能命名" and file_info.original_name != "未指定":
+                    print(f"    原始名称: {file_info.original_name}")
         
         if self.failed_files:
             print("\n提取失败的文件:")
             for error_info in self.failed_files:
-                print(f"  {error_info['file']}: {error_info['error']}")
+                print(f"  {error_info.file}: {error_info.error}")
 
 def main():
     """
@@ -9,6 +9,7 @@ import os
 import sys
 import traceback
 import logging
+from collections import Counter, deque
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from enum import Enum
@@ -69,9 +70,15 @@ class PPTExtractorError(Exception):
 class ErrorHandler:
     """错误处理器"""
     
-    def __init__(self, log_file: Optional[str] = None, enable_console: bool = True):
-        self.errors = []
-        self.warnings = []
+    def __init__(self, log_file: Optional[str] = None, enable_console: bool = True,
+                 max_retain: int = 10000):
+        # 有界deque防止长时间运行时错误对象无限累积撑爆内存；
+        # 错误代码计数单独用Counter维护，摘要统计O(1)且不受淘汰影响
+        self.errors = deque(maxlen=max_retain)
+        self.warnings = deque(maxlen=max_retain)
+        self._error_counts = Counter()
+        self._total_errors = 0
+        self._total_warnings = 0
         self.log_file = log_file
         self.enable_console = enable_console
         
@@ -79,10 +86,14 @@ class ErrorHandler:
         self._setup_logger()
     
     def _setup_logger(self):
-        """设置日志记录器"""
+        """设置日志记录器（幂等：已装配过且无新配置时直接复用）"""
         self.logger = logging.getLogger('PPTExtractor')
         self.logger.setLevel(logging.DEBUG)
         
+        # 同进程内反复构造ErrorHandler时无需重建处理器
+        if self.logger.handlers and not self.log_file:
+            return
+        
         # 清除现有的处理器
         self.logger.handlers.clear()
         
@@ -116,19 +127,26 @@ class ErrorHandler:
             ppt_error = error
         else:
             # 将标准异常转换为PPT提取器异常
+            # format_exc遍历整条调用栈、开销不小，只在真有处理器会落
+            # DEBUG记录时捕获（logger本身恒为DEBUG级，isEnabledFor挡不住；
+            # 控制台处理器只收INFO，通常仅文件处理器会用到traceback）
             error_code = self._classify_error(error)
+            details = {
+                'original_type': error.__class__.__name__,
+                'context': context or {}
+            }
+            if any(handler.level <= logging.DEBUG for handler in self.logger.handlers):
+                details['traceback'] = traceback.format_exc()
             ppt_error = PPTExtractorError(
                 message=str(error),
                 error_code=error_code,
-                details={
-                    'original_type': type(error).__name__,
-                    'traceback': traceback.format_exc(),
-                    'context': context or {}
-                }
+                details=details
             )
         
         # 记录错误
         self.errors.append(ppt_error)
+        self._error_counts[ppt_error.error_code.value] += 1
+        self._total_errors += 1
         
         # 记录日志
         self.logger.error(f"{ppt_error.error_code.value}: {ppt_error.message}")
@@ -146,61 +164,59 @@ class ErrorHandler:
         }
         
         self.warnings.append(warning)
+        self._total_warnings += 1
         self.logger.warning(message)
     
+    # 异常类型到错误代码的直接映射；PermissionError/OSError还要
+    # 结合消息内容细分，不进表、单独处理
+    _TYPE_CODE_MAP = {
+        FileNotFoundError: ErrorCode.FILE_NOT_FOUND,
+        IsADirectoryError: ErrorCode.FILE_FORMAT_UNSUPPORTED,
+        MemoryError: ErrorCode.MEMORY_ERROR,
+    }
+    
     def _classify_error(self, error: Exception) -> ErrorCode:
-        """分类错误类型"""
-        error_type = type(error).__name__
+        """分类错误类型（按MRO查表代替isinstance链，消息只小写一次）"""
         error_message = str(error).lower()
         
-        # 文件相关错误
-        if isinstance(error, FileNotFoundError):
-            return ErrorCode.FILE_NOT_FOUND
-        elif isinstance(error, PermissionError):
+        # 权限错误（需结合消息区分文件/目录）
+        if isinstance(error, PermissionError):
             if 'directory' in error_message or 'folder' in error_message:
                 return ErrorCode.DIR_ACCESS_DENIED
-            else:
-                return ErrorCode.FILE_ACCESS_DENIED
-        elif isinstance(error, IsADirectoryError):
-            return ErrorCode.FILE_FORMAT_UNSUPPORTED
+            return ErrorCode.FILE_ACCESS_DENIED
         
-        # 内存相关错误
-        elif isinstance(error, MemoryError):
-            return ErrorCode.MEMORY_ERROR
+        # 文件/内存相关错误：沿MRO查表，一次dict命中
+        for cls in type(error).__mro__:
+            code = self._TYPE_CODE_MAP.get(cls)
+            if code is not None:
+                return code
         
         # 磁盘空间错误
-        elif isinstance(error, OSError):
+        if isinstance(error, OSError):
             if 'no space left' in error_message or 'disk full' in error_message:
                 return ErrorCode.DISK_SPACE_ERROR
-            elif 'permission denied' in error_message:
+            if 'permission denied' in error_message:
                 return ErrorCode.PERMISSION_ERROR
-            else:
-                return ErrorCode.UNKNOWN_ERROR
+            return ErrorCode.UNKNOWN_ERROR
         
         # ZIP相关错误（文件损坏）
-        elif 'zipfile' in error_type.lower() or 'bad zip file' in error_message:
+        if 'zipfile' in error.__class__.__name__.lower() or 'bad zip file' in error_message:
             return ErrorCode.FILE_CORRUPTED
         
         # 其他错误
-        else:
-            return ErrorCode.UNKNOWN_ERROR
+        return ErrorCode.UNKNOWN_ERROR
     
     def get_error_summary(self) -> Dict[str, Any]:
-        """获取错误摘要"""
-        error_counts = {}
-        for error in self.errors:
-            code = error.error_code.value
-            error_counts[code] = error_counts.get(code, 0) + 1
-        
+        """获取错误摘要（计数在handle_error中增量维护，这里直接读取）"""
         return {
-            'total_errors': len(self.errors),
-            'total_warnings': len(self.warnings),
-            'error_counts': error_counts,
+            'total_errors': self._total_errors,
+            'total_warnings': self._total_warnings,
+            'error_counts': dict(self._error_counts),
             'latest_errors': [{
                 'code': error.error_code.value,
                 'message': error.message,
                 'timestamp': error.timestamp.isoformat()
-            } for error in self.errors[-5:]]  # 最近5个错误
+            } for error in list(self.errors)[-5:]]  # 最近5个错误
         }
     
     def generate_error_report(self) -> str:
@@ -263,6 +279,9 @@ class ErrorHandler:
         """清除所有错误和警告"""
         self.errors.clear()
         self.warnings.clear()
+        self._error_counts.clear()
+        self._total_errors = 0
+        self._total_warnings = 0
         self.logger.info("错误和警告记录已清除")
 
 
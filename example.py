@@ -8,6 +8,7 @@ PPT嵌入对象提取工具 - 使用示例
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # 添加当前目录到Python路径
@@ -181,6 +182,16 @@ def example_error_handling():
             print("\n📊 错误摘要功能不可用")
 
 
+def _extract_one(ppt_path, output_dir, log_file):
+    """
+    批量任务的工作函数（顶层定义保证可pickle，供进程池调用）
+    每个工作进程写带PID后缀的独立日志，避免多进程争用同一日志文件
+    """
+    worker_log = f"{log_file}.{os.getpid()}"
+    extractor = PPTExtractor(log_file=worker_log)
+    return extractor.extract_embedded_objects(ppt_path, output_dir)
+
+
 def example_batch_processing():
     """
     示例5: 批量处理多个PPT文件
@@ -200,38 +211,48 @@ def example_batch_processing():
     
     print(f"📁 发现 {len(ppt_files)} 个PPT文件")
     
-    # 创建提取器
-    extractor = PPTExtractor(log_file="batch_extraction.log")
+    # 先剔除不存在的文件
+    pending = []
+    for i, ppt_file in enumerate(ppt_files, 1):
+        if os.path.exists(str(ppt_file)):
+            pending.append((i, ppt_file))
+        else:
+            print(f"\n🔄 处理文件 {i}/{len(ppt_files)}: {ppt_file}")
+            print(f"   ⚠️  文件不存在，跳过")
     
-    # 批量处理
+    # 批量处理：各文件的提取互相独立，按CPU核数开进程池并行
     total_extracted = 0
     total_failed = 0
     
-    for i, ppt_file in enumerate(ppt_files, 1):
-        print(f"\n🔄 处理文件 {i}/{len(ppt_files)}: {ppt_file}")
-        
-        if not os.path.exists(str(ppt_file)):
-            print(f"   ⚠️  文件不存在，跳过")
-            continue
-        
-        try:
-            output_dir = f"batch_output/file_{i}"
-            result = extractor.extract_embedded_objects(str(ppt_file), output_dir)
-            
-            summary = result.get('summary', {})
-            extracted = summary.get('extracted', 0)
-            failed = summary.get('failed', 0)
-            
-            total_extracted += extracted
-            total_failed += failed
-            
-            print(f"   ✅ 提取成功: {extracted} 个文件")
-            if failed > 0:
-                print(f"   ❌ 提取失败: {failed} 个文件")
+    if pending:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_extract_one, str(ppt_file),
+                                f"batch_output/file_{i}", "batch_extraction.log"): (i, ppt_file)
+                for i, ppt_file in pending
+            }
+            for future in as_completed(futures):
+                i, ppt_file = futures[future]
+                print(f"\n🔄 处理文件 {i}/{len(ppt_files)}: {ppt_file}")
                 
-        except Exception as e:
-            print(f"   💥 处理失败: {e}")
-            total_failed += 1
+                try:
+                    result = future.result()
+                    
+                    summary = result.get('summary', {})
+                    extracted = summary.get('extracted', 0)
+                    failed = summary.get('failed', 0)
+                    
+                    total_extracted += extracted
+                    total_failed += failed
+                    
+                    print(f"   ✅ 提取成功: {extracted} 个文件")
+                    if failed > 0:
+                        print(f"   ❌ 提取失败: {failed} 个文件")
+                        
+                except Exception as e:
+                    print(f"   💥 处理失败: {e}")
+                    total_failed += 1
     
     print(f"\n📊 批量处理完成:")
     print(f"   总计提取成功: {total_extracted} 个文件")
@@ -5,17 +5,107 @@
 提供精确的文件类型识别功能
 """
 
+import hashlib
 import os
+import struct
 import zipfile
 import io
-from typing import Tuple, Dict, Optional
+from collections import defaultdict
+from functools import lru_cache
+
+# 可选依赖：pyahocorasick提供多模式串一趟匹配；缺席时退回逐个in搜索
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# ASCII小写化查表（translate按表拷贝，一趟完成）
+_TOLOWER = bytes(range(256)).lower()
+
+# 可选依赖：Magika用小型模型做内容识别，对签名法分不清的疑难二进制
+# （OLE/CFBF变体等）准确率更高；缺席时完全走现有签名检测
+try:
+    from magika import Magika
+except ImportError:
+    Magika = None
+from typing import Iterator, Tuple, Dict, Optional
 import xml.etree.ElementTree as ET
 
 
+class _BytesReader:
+    """
+    memoryview之上的只读file-like，供zipfile回退探测使用
+    不像io.BytesIO那样持有数据副本，50MB的嵌入对象探测零拷贝
+    """
+    
+    def __init__(self, data: bytes) -> None:
+        self._mv = memoryview(data)
+        self._pos = 0
+    
+    def read(self, n: int = -1) -> bytes:
+        if n is None or n < 0:
+            chunk = self._mv[self._pos:]
+        else:
+            chunk = self._mv[self._pos:self._pos + n]
+        self._pos += len(chunk)
+        return bytes(chunk)
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 0:
+            self._pos = offset
+        elif whence == 1:
+            self._pos += offset
+        else:
+            self._pos = len(self._mv) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+
+
 class FileTypeDetector:
     """文件类型检测器"""
     
-    def __init__(self):
+    # 检测结果缓存上限（批量处理同模板PPT时大量blob近乎重复）
+    _CACHE_MAX = 1024
+    
+    # 文本判定允许的字节集合（可见ASCII+常见空白），供translate快速剔除
+    _TEXT_BYTES = bytes(range(0x20, 0x7f)) + b'\t\n\r\f\v'
+    
+    # str.translate删除表：控制字符（C0除空白外、DEL与C1区），
+    # 解码兜底时用一趟查表代替逐字符isprintable循环
+    _DELETE_MAP = {cp: None for cp in range(0x20) if cp not in (9, 10, 11, 12, 13)}
+    _DELETE_MAP.update(dict.fromkeys(range(0x7f, 0xa0)))
+    
+    _SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+    
+    # 文件类别定义（类级常量，避免每次调用重建dict）
+    _CATEGORIES = {
+        'document': ['doc', 'docx', 'pdf', 'rtf', 'txt', 'odt'],
+        'spreadsheet': ['xls', 'xlsx', 'ods', 'csv'],
+        'presentation': ['ppt', 'pptx', 'odp'],
+        'image': ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'svg'],
+        'audio': ['mp3', 'wav', 'wma', 'aac', 'flac', 'ogg'],
+        'video': ['mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm'],
+        'archive': ['zip', 'rar', '7z', 'tar', 'gz', 'bz2'],
+        'executable': ['exe', 'msi', 'deb', 'rpm', 'dmg']
+    }
+    
+    # 扩展名到类别的反查表（一次构建，查询O(1)）
+    _EXT_TO_CATEGORY = {ext: category for category, exts in _CATEGORIES.items()
+                        for ext in exts}
+    
+    def __init__(self) -> None:
+        # 按(内容头部指纹, 长度, 扩展名)缓存检测结果，
+        # 命中时跳过ZIP/OLE探测这些每次数毫秒的重活
+        self._result_cache = {}
         # 文件头签名映射
         self.file_signatures = {
             # Office文档 (新格式)
@@ -63,6 +153,32 @@ class FileTypeDetector:
             b'\x7F\x45\x4C\x46': 'elf',
         }
         
+        # 按签名长度分桶建哈希索引，批量检测时几次dict查找
+        # 取代逐条startswith的线性扫描
+        self._build_signature_index()
+        
+        # Magika模型实例（装有magika时才加载，识别疑难样本用）
+        self._magika = Magika() if Magika is not None else None
+        
+        # OLE复合文档的类型特征串（匹配前先做小写化）
+        self._ole_needles = (
+            (b'microsoft office word', 'doc'),
+            (b'word.document', 'doc'),
+            (b'microsoft office excel', 'xls'),
+            (b'excel.sheet', 'xls'),
+            (b'microsoft office powerpoint', 'ppt'),
+            (b'powerpoint.slide', 'ppt'),
+            (b'wordpad', 'doc'),
+        )
+        if ahocorasick is not None:
+            # 多模式串一趟线性扫描，代替7次独立的子串搜索
+            self._ole_automaton = ahocorasick.Automaton()
+            for needle, ole_type in self._ole_needles:
+                self._ole_automaton.add_word(needle, ole_type)
+            self._ole_automaton.make_automaton()
+        else:
+            self._ole_automaton = None
+        
         # MIME类型映射
         self.mime_types = {
             'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
@@ -110,6 +226,18 @@ class FileTypeDetector:
             'unknown': '未知文件类型'
         }
     
+    def _build_signature_index(self) -> None:
+        """
+        按签名长度分桶建哈希表：检测时每个长度只做一次切片+dict探测，
+        从长到短依次尝试，前缀重叠的签名（如{\rtf1与{\rtf）长者优先
+        """
+        sigs_by_len = defaultdict(dict)
+        for signature, file_type in self.file_signatures.items():
+            sigs_by_len[len(signature)][signature] = file_type
+        self._sigs_by_len = dict(sigs_by_len)
+        self._sorted_lens = sorted(self._sigs_by_len, reverse=True)
+        self._max_sig_len = self._sorted_lens[0]
+    
     def detect_file_type(self, file_data: bytes, file_path: str = "") -> Tuple[str, str, str]:
         """
         检测文件类型
@@ -121,6 +249,23 @@ class FileTypeDetector:
         Returns:
             (文件扩展名, 文件类型描述, MIME类型)
         """
+        # 指纹只摘要前4KB；长度进key防止同头不同尾的误命中
+        cache_key = (hashlib.blake2b(file_data[:4096], digest_size=8).digest(),
+                     len(file_data),
+                     os.path.splitext(file_path)[1].lower())
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self._detect_file_type_uncached(file_data, file_path)
+        if len(self._result_cache) >= self._CACHE_MAX:
+            # 简单FIFO淘汰：弹出最早插入的一项
+            self._result_cache.pop(next(iter(self._result_cache)))
+        self._result_cache[cache_key] = result
+        return result
+    
+    def _detect_file_type_uncached(self, file_data: bytes, file_path: str = "") -> Tuple[str, str, str]:
+        """完整走一遍签名/容器探测（缓存未命中时调用）"""
         # 首先通过文件头签名检测
         detected_type = self._detect_by_signature(file_data)
         
@@ -137,8 +282,8 @@ class FileTypeDetector:
                     return '.zip', 'ZIP压缩文件', 'application/zip'
             
             elif detected_type == 'ole_compound':
-                # 检测OLE复合文档类型
-                ole_type = self._detect_ole_document(file_data)
+                # 检测OLE复合文档类型（特征串失手时再请模型出场）
+                ole_type = self._detect_ole_document(file_data) or self._detect_by_magika(file_data)
                 if ole_type:
                     ext = f'.{ole_type}'
                     desc = self.type_descriptions.get(ole_type, '未知OLE文档')
@@ -175,118 +320,188 @@ class FileTypeDetector:
         if self._is_text_file(file_data):
             return '.txt', '文本文件', 'text/plain'
         
+        # 签名、扩展名、文本判定全部落空时，给模型最后一次机会
+        magika_type = self._detect_by_magika(file_data)
+        if magika_type:
+            desc = self.type_descriptions.get(magika_type, f'{magika_type.upper()}文件')
+            mime = self.mime_types.get(magika_type, 'application/octet-stream')
+            return f'.{magika_type}', desc, mime
+        
         # 默认为未知类型
         return '.bin', '未知文件类型', 'application/octet-stream'
     
+    def _detect_by_magika(self, file_data: bytes) -> Optional[str]:
+        """
+        可选的Magika模型识别：只喂前4KB（模型默认窗口），
+        低置信度或标签不在已知类型表内时返回None，交回签名逻辑
+        """
+        if self._magika is None:
+            return None
+        try:
+            result = self._magika.identify_bytes(bytes(file_data[:4096]))
+            if result.output.score < 0.9:
+                return None
+            label = result.output.ct_label
+            if label in self.type_descriptions:
+                return label
+            return self._EXT_VARIANTS.get(label)
+        except Exception:
+            return None
+    
     def _detect_by_signature(self, file_data: bytes) -> Optional[str]:
         """
-        通过文件头签名检测文件类型
+        通过文件头签名检测文件类型（长度分桶哈希探测，C层切片+查表）
         """
-        for signature, file_type in self.file_signatures.items():
-            if file_data.startswith(signature):
+        head = bytes(file_data[:self._max_sig_len])
+        
+        for length in self._sorted_lens:
+            file_type = self._sigs_by_len[length].get(head[:length])
+            if file_type:
                 return file_type
         
         # 检查更长的签名
-        if len(file_data) >= 8:
-            # 检查MP4签名
-            if file_data[4:8] == b'ftyp':
+        if len(head) >= 8:
+            # 检查MP4签名（ftyp位于偏移4处）
+            if head[4:8] == b'ftyp':
                 return 'mp4'
         
         return None
     
+    @staticmethod
+    def _iter_zip_names(file_data: bytes) -> Iterator[bytes]:
+        """
+        直接走EOCD+中央目录枚举ZIP条目名
+        只读文件名字段，不构造ZipFile/ZipInfo对象，也不需要任何解压
+        """
+        # EOCD记录固定22字节+最长64KB注释，在尾部64KB内反向定位签名
+        tail_len = min(len(file_data), 65557)
+        tail = file_data[-tail_len:]
+        eocd = tail.rfind(b'PK\x05\x06')
+        if eocd < 0:
+            return
+        base = len(file_data) - tail_len + eocd
+        total_entries, cd_size, cd_offset = struct.unpack_from('<HLL', file_data, base + 10)
+        
+        mv = memoryview(file_data)
+        pos = cd_offset
+        for _ in range(total_entries):
+            if pos + 46 > len(file_data) or bytes(mv[pos:pos + 4]) != b'PK\x01\x02':
+                return
+            name_len, extra_len, comment_len = struct.unpack_from('<HHH', file_data, pos + 28)
+            yield bytes(mv[pos + 46:pos + 46 + name_len])
+            pos += 46 + name_len + extra_len + comment_len
+    
     def _detect_office_document(self, file_data: bytes) -> Optional[str]:
         """
         检测Office文档类型（基于ZIP的新格式）
+        扫中央目录文件名，命中哨兵文件即短路返回；
+        只有都未命中时才解压[Content_Types].xml兜底
         """
         try:
-            with zipfile.ZipFile(io.BytesIO(file_data), 'r') as zf:
-                file_list = zf.namelist()
-                
-                # 检查特征文件
-                if 'word/document.xml' in file_list:
+            saw_any = False
+            saw_content_types = False
+            for name in self._iter_zip_names(file_data):
+                saw_any = True
+                if name == b'word/document.xml':
                     return 'docx'
-                elif 'xl/workbook.xml' in file_list:
+                if name == b'xl/workbook.xml':
                     return 'xlsx'
-                elif 'ppt/presentation.xml' in file_list:
+                if name == b'ppt/presentation.xml':
                     return 'pptx'
-                elif '[Content_Types].xml' in file_list:
-                    # 通过Content_Types.xml进一步判断
-                    try:
+                if name == b'[Content_Types].xml':
+                    saw_content_types = True
+            
+            if not saw_any:
+                # 中央目录缺失/截断时的退化路径：局部文件头里的文件名是
+                # 明文存储的，直接在头尾字节窗口上find哨兵名，逐个命中即返回
+                window = file_data[:131072] + file_data[-65536:]
+                if window.find(b'word/document.xml') >= 0:
+                    return 'docx'
+                if window.find(b'xl/workbook.xml') >= 0:
+                    return 'xlsx'
+                if window.find(b'ppt/presentation.xml') >= 0:
+                    return 'pptx'
+            
+            if saw_content_types:
+                # 通过Content_Types.xml进一步判断（memoryview包装，零拷贝）
+                try:
+                    with zipfile.ZipFile(_BytesReader(file_data), 'r') as zf:
                         content_types = zf.read('[Content_Types].xml')
-                        if b'wordprocessingml' in content_types:
-                            return 'docx'
-                        elif b'spreadsheetml' in content_types:
-                            return 'xlsx'
-                        elif b'presentationml' in content_types:
-                            return 'pptx'
-                    except:
-                        pass
-                
-                return None
+                    if b'wordprocessingml' in content_types:
+                        return 'docx'
+                    elif b'spreadsheetml' in content_types:
+                        return 'xlsx'
+                    elif b'presentationml' in content_types:
+                        return 'pptx'
+                except:
+                    pass
+            
+            return None
         except:
             return None
     
     def _detect_ole_document(self, file_data: bytes) -> Optional[str]:
         """
         检测OLE复合文档类型（旧格式Office文档）
+        在文件的前几KB中查找特征字符串；装有pyahocorasick时
+        全部特征串一趟扫完，首个命中即返回
         """
         try:
-            # 简单的OLE文档类型检测
-            # 在文件的前几KB中查找特征字符串
-            search_data = file_data[:4096].lower()
+            search_data = file_data[:4096].translate(_TOLOWER)
+            
+            if self._ole_automaton is not None:
+                for _, ole_type in self._ole_automaton.iter(search_data):
+                    return ole_type
+                return None
             
-            if b'microsoft office word' in search_data or b'word.document' in search_data:
-                return 'doc'
-            elif b'microsoft office excel' in search_data or b'excel.sheet' in search_data:
-                return 'xls'
-            elif b'microsoft office powerpoint' in search_data or b'powerpoint.slide' in search_data:
-                return 'ppt'
-            elif b'wordpad' in search_data:
-                return 'doc'
+            for needle, ole_type in self._ole_needles:
+                if needle in search_data:
+                    return ole_type
             
             return None
         except:
             return None
     
+    # 常见的扩展名变体
+    _EXT_VARIANTS = {
+        'htm': 'html',
+        'jpeg': 'jpg',
+        'tiff': 'tif',
+        'mpeg': 'mpg'
+    }
+    
     def _detect_by_extension(self, file_path: str) -> Optional[str]:
         """
-        通过文件扩展名检测文件类型
+        通过文件扩展名检测文件类型（批量场景下路径高度重复，结果走缓存）
         """
         if not file_path:
             return None
         
-        ext = os.path.splitext(file_path.lower())[1][1:]  # 去掉点号
-        
-        if ext in self.type_descriptions:
-            return ext
-        
-        # 检查常见的扩展名变体
-        ext_variants = {
-            'htm': 'html',
-            'jpeg': 'jpg',
-            'tiff': 'tif',
-            'mpeg': 'mpg'
-        }
-        
-        return ext_variants.get(ext)
+        return _ext_type_cached(file_path)
     
     def _is_text_file(self, file_data: bytes) -> bool:
         """
         检测是否为文本文件
+        先在字节层用translate一趟剔除合法文本字节（C速度的查表拷贝），
+        纯ASCII/日志类直接判定；字节测试不通过时再解码一次兜底多字节文本
         """
         try:
-            # 尝试解码为UTF-8
-            sample_size = min(1024, len(file_data))
-            sample_data = file_data[:sample_size]
-            
-            # 检查是否包含过多的控制字符
-            text = sample_data.decode('utf-8', errors='ignore')
+            sample = file_data[:1024]
+            if not sample:
+                return False
             
-            # 计算可打印字符的比例
-            printable_chars = sum(1 for c in text if c.isprintable() or c.isspace())
-            ratio = printable_chars / len(text) if text else 0
+            # 残留字节即不属于可见ASCII+空白的部分
+            bad = len(sample.translate(None, self._TEXT_BYTES))
+            if bad <= 0.3 * len(sample):
+                return True
             
-            return ratio > 0.7  # 如果70%以上是可打印字符，认为是文本文件
+            # 含多字节字符（如UTF-8中文）时按字符比例兜底判定
+            # translate按删除表剔除控制字符，长度差即非文本字符数
+            text = sample.decode('utf-8', errors='ignore')
+            if not text:
+                return False
+            printable_chars = len(text.translate(self._DELETE_MAP))
+            return printable_chars / len(text) > 0.7  # 70%以上可打印字符视为文本
         except:
             return False
     
@@ -300,22 +515,7 @@ class FileTypeDetector:
         Returns:
             文件类别
         """
-        categories = {
-            'document': ['doc', 'docx', 'pdf', 'rtf', 'txt', 'odt'],
-            'spreadsheet': ['xls', 'xlsx', 'ods', 'csv'],
-            'presentation': ['ppt', 'pptx', 'odp'],
-            'image': ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'svg'],
-            'audio': ['mp3', 'wav', 'wma', 'aac', 'flac', 'ogg'],
-            'video': ['mp4', 'avi', 'mkv', 'mov', 'wmv', 'flv', 'webm'],
-            'archive': ['zip', 'rar', '7z', 'tar', 'gz', 'bz2'],
-            'executable': ['exe', 'msi', 'deb', 'rpm', 'dmg']
-        }
-        
-        for category, extensions in categories.items():
-            if file_type.lower() in extensions:
-                return category
-        
-        return 'other'
+        return _category_cached(file_type)
     
     def format_file_size(self, size_bytes: int) -> str:
         """
@@ -327,13 +527,43 @@ class FileTypeDetector:
         Returns:
             格式化的文件大小字符串
         """
-        if size_bytes == 0:
-            return "0 B"
-        
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        import math
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        
-        return f"{s} {size_names[i]}"
\ No newline at end of file
+        # 同一大小往往会被格式化多次（逐文件日志+汇总报告），走模块级缓存
+        return _format_size_cached(size_bytes)
+
+
+@lru_cache(maxsize=256)
+def _format_size_cached(size_bytes: int) -> str:
+    if size_bytes == 0:
+        return "0 B"
+    
+    # bit_length整数运算直接得出1024的幂次，省掉log/pow两次libm调用
+    names = FileTypeDetector._SIZE_NAMES
+    i = min(len(names) - 1, (size_bytes.bit_length() - 1) // 10)
+    p = 1 << (10 * i)
+    
+    return f"{size_bytes / p:.2f} {names[i]}"
+
+
+@lru_cache(maxsize=256)
+def _ext_type_cached(file_path: str) -> Optional[str]:
+    """路径到已知扩展名的缓存解析（splitext+小写只做一次）"""
+    ext = os.path.splitext(file_path)[1][1:].lower()  # 去掉点号
+    # type_descriptions是实例属性但内容固定，借模块级快照判断
+    if ext in _KNOWN_EXTS:
+        return ext
+    return FileTypeDetector._EXT_VARIANTS.get(ext)
+
+
+@lru_cache(maxsize=256)
+def _category_cached(file_type: str) -> str:
+    return FileTypeDetector._EXT_TO_CATEGORY.get(file_type.lower(), 'other')
+
+
+# 已知扩展名集合（与type_descriptions的键一致），供缓存函数使用
+_KNOWN_EXTS = frozenset(FileTypeDetector().type_descriptions)
+
+# 存在AOT编译版本（mypyc/Cython产物）时优先使用，纯Python实现作为兜底
+try:
+    from file_type_detector_compiled import FileTypeDetector  # noqa: F811
+except ImportError:
+    pass
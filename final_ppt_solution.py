@@ -11,6 +11,29 @@ import shutil
 from pathlib import Path
 from enhanced_ppt_extractor import EnhancedPPTExtractor
 
+def fast_copy(src_path, dst_path):
+    """
+    快速复制：优先os.link硬链接（纯元数据操作，零数据拷贝），
+    失败时退到copy_file_range（内核内拷贝），最后才是shutil.copy2
+    """
+    try:
+        os.link(src_path, dst_path)
+        return
+    except OSError:
+        pass  # 跨文件系统/平台不支持硬链接
+    try:
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        return
+    except (AttributeError, OSError):
+        pass
+    shutil.copy2(src_path, dst_path)
+
 def create_solution_guide():
     """
     创建解决方案指南
@@ -67,13 +90,23 @@ def demonstrate_complete_solution():
     print("\n=== 实际演示 ===")
     
     # 1. 使用现有的提取结果
+    # 目录只用os.scandir扫一遍，按后缀分桶，后面三个环节共用结果；
+    # 列表里直接存Path对象，存在性由目录枚举保证，后续不再逐个stat
     print("\n1. 当前提取结果分析:")
-    extracted_dir = "extracted_objects"
-    if os.path.exists(extracted_dir):
-        files = os.listdir(extracted_dir)
-        word_files = [f for f in files if f.endswith('.docx')]
-        excel_files = [f for f in files if f.endswith('.xlsx')]
-        other_files = [f for f in files if not f.endswith(('.docx', '.xlsx'))]
+    extracted = Path("extracted_objects")
+    all_files = []
+    buckets = {'.docx': [], '.xlsx': [], '.pptx': [], 'other': []}
+    if extracted.is_dir():
+        with os.scandir(extracted) as it:
+            for entry in it:
+                path = extracted / entry.name
+                all_files.append(path)
+                buckets.get(path.suffix.lower(), buckets['other']).append(path)
+    
+    if all_files:
+        word_files = buckets['.docx']
+        excel_files = buckets['.xlsx']
+        other_files = buckets['.pptx'] + buckets['other']
         
         print(f"   Word文档: {len(word_files)} 个")
         print(f"   Excel表格: {len(excel_files)} 个")
@@ -81,53 +114,51 @@ def demonstrate_complete_solution():
         
         print("\n   Word文档列表:")
         for i, f in enumerate(word_files[:5], 1):
-            print(f"     {i}. {f}")
+            print(f"     {i}. {f.name}")
         if len(word_files) > 5:
             print(f"     ... 还有 {len(word_files) - 5} 个")
         
         print("\n   Excel表格列表:")
         for i, f in enumerate(excel_files[:5], 1):
-            print(f"     {i}. {f}")
+            print(f"     {i}. {f.name}")
         if len(excel_files) > 5:
             print(f"     ... 还有 {len(excel_files) - 5} 个")
     
     # 2. 创建智能命名版本
     print("\n2. 创建智能命名版本:")
-    smart_dir = "final_smart_naming"
-    if os.path.exists(smart_dir):
+    smart_dir = Path("final_smart_naming")
+    if smart_dir.is_dir():
         shutil.rmtree(smart_dir)
     os.makedirs(smart_dir, exist_ok=True)
     
-    if os.path.exists(extracted_dir):
-        files = os.listdir(extracted_dir)
+    if all_files:
         word_count = 1
         excel_count = 1
         ppt_count = 1
         other_count = 1
         
-        for file in files:
-            src_path = os.path.join(extracted_dir, file)
-            if file.endswith('.docx'):
+        for src_path in all_files:
+            suffix = src_path.suffix.lower()
+            if suffix == '.docx':
                 new_name = f"Word文档_{word_count:02d}.docx"
                 word_count += 1
-            elif file.endswith('.xlsx'):
+            elif suffix == '.xlsx':
                 new_name = f"Excel表格_{excel_count:02d}.xlsx"
                 excel_count += 1
-            elif file.endswith('.pptx'):
+            elif suffix == '.pptx':
                 new_name = f"PowerPoint演示文稿_{ppt_count:02d}.pptx"
                 ppt_count += 1
-            elif file.startswith('oleObject'):
+            elif src_path.name.startswith('oleObject'):
                 continue  # 跳过二进制文件
             else:
-                new_name = f"其他文件_{other_count:02d}{Path(file).suffix}"
+                new_name = f"其他文件_{other_count:02d}{src_path.suffix}"
                 other_count += 1
             
-            dst_path = os.path.join(smart_dir, new_name)
             try:
-                shutil.copy2(src_path, dst_path)
-                print(f"   {file} → {new_name}")
+                fast_copy(src_path, smart_dir / new_name)
+                print(f"   {src_path.name} → {new_name}")
             except Exception as e:
-                print(f"   复制失败: {file} - {e}")
+                print(f"   复制失败: {src_path.name} - {e}")
     
     # 3. 创建文件名映射模板
     print("\n3. 创建文件名映射模板:")
@@ -137,23 +168,25 @@ def demonstrate_complete_solution():
         "mappings": []
     }
     
-    if os.path.exists(extracted_dir):
-        files = [f for f in os.listdir(extracted_dir) if f.endswith(('.docx', '.xlsx', '.pptx'))]
-        for i, file in enumerate(files, 1):
+    office_files = buckets['.docx'] + buckets['.xlsx'] + buckets['.pptx']
+    if office_files:
+        for i, file in enumerate(office_files, 1):
+            suffix = file.suffix.lower()
             mapping = {
                 "序号": i,
-                "当前文件名": file,
-                "文件类型": "Word文档" if file.endswith('.docx') else 
-                           "Excel表格" if file.endswith('.xlsx') else 
-                           "PowerPoint演示文稿" if file.endswith('.pptx') else "未知",
-                "原始文件名": f"请填写原始文件名{i}.{file.split('.')[-1]}",
+                "当前文件名": file.name,
+                "文件类型": "Word文档" if suffix == '.docx' else 
+                           "Excel表格" if suffix == '.xlsx' else 
+                           "PowerPoint演示文稿" if suffix == '.pptx' else "未知",
+                "原始文件名": f"请填写原始文件名{i}.{file.suffix[1:]}",
                 "描述": "请填写文件描述"
             }
             mapping_template["mappings"].append(mapping)
     
+    # 一次性渲染成bytes整块写出，跳过文本模式包装层的小块编码写
     mapping_file = f"{Path(ppt_file).stem}_文件名映射模板.json"
-    with open(mapping_file, 'w', encoding='utf-8') as f:
-        json.dump(mapping_template, f, ensure_ascii=False, indent=2)
+    payload = json.dumps(mapping_template, ensure_ascii=False, indent=2).encode('utf-8')
+    Path(mapping_file).write_bytes(payload)
     
     print(f"   映射模板已创建: {mapping_file}")
     print(f"   请编辑此文件，填写正确的原始文件名")
@@ -172,36 +205,35 @@ def demonstrate_complete_solution():
             mapping["原始文件名"] = sample_names[i]
             mapping["描述"] = f"这是第{i+1}个嵌入的{mapping['文件类型']}"
     
+    # 填入示例名后只重新序列化这一次
     sample_mapping_file = f"{Path(ppt_file).stem}_示例映射.json"
-    with open(sample_mapping_file, 'w', encoding='utf-8') as f:
-        json.dump(mapping_template, f, ensure_ascii=False, indent=2)
+    payload = json.dumps(mapping_template, ensure_ascii=False, indent=2).encode('utf-8')
+    Path(sample_mapping_file).write_bytes(payload)
     
     print(f"   示例映射已创建: {sample_mapping_file}")
     
     # 5. 使用示例映射重命名文件
     print("\n5. 使用示例映射重命名文件:")
-    mapped_dir = "final_mapped_naming"
-    if os.path.exists(mapped_dir):
+    mapped_dir = Path("final_mapped_naming")
+    if mapped_dir.is_dir():
         shutil.rmtree(mapped_dir)
     os.makedirs(mapped_dir, exist_ok=True)
     
+    # 映射条目均来自上面的目录枚举，无需再逐个exists探测，
+    # 竞态下的缺失由fast_copy抛错并落入异常分支
     for mapping in mapping_template["mappings"]:
         src_file = mapping["当前文件名"]
         dst_file = mapping["原始文件名"]
-        src_path = os.path.join(extracted_dir, src_file)
-        dst_path = os.path.join(mapped_dir, dst_file)
-        
-        if os.path.exists(src_path):
-            try:
-                shutil.copy2(src_path, dst_path)
-                print(f"   {src_file} → {dst_file}")
-            except Exception as e:
-                print(f"   重命名失败: {src_file} - {e}")
+        try:
+            fast_copy(extracted / src_file, mapped_dir / dst_file)
+            print(f"   {src_file} → {dst_file}")
+        except Exception as e:
+            print(f"   重命名失败: {src_file} - {e}")
     
     # 6. 总结
     print("\n=== 解决方案总结 ===")
     print("\n已创建的文件和目录:")
-    print(f"   1. 原始提取结果: {extracted_dir}/")
+    print(f"   1. 原始提取结果: {extracted}/")
     print(f"   2. 智能命名结果: {smart_dir}/")
     print(f"   3. 映射模板文件: {mapping_file}")
     print(f"   4. 示例映射文件: {sample_mapping_file}")
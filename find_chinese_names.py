@@ -1,69 +1,159 @@
+import io
+import mmap
+import os
 import zipfile
 import xml.etree.ElementTree as ET
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+from pptx_scan_common import has_cjk_utf8_lead
+
+# CJK基本区（U+4E00-U+9FFF）的UTF-8编码固定落在\xe4-\xe9开头的3字节序列，
+# 直接在原始字节上扫描，OOXML里占绝大多数的ASCII样板完全不用解码
+_CJK_BYTES = rb'(?:[\xe4-\xe9][\x80-\xbf][\x80-\xbf])'
+
+# 四类中文内容合并成一个带命名分组的交替式，每个XML只扫一遍
+# （原来name/title/文本节点/任意中文四个findall要把全文扫四遍）
+COMBINED_PATTERN = re.compile(
+    rb'name="(?P<name>[^"]*' + _CJK_BYTES + rb'[^"]*?)"'
+    rb'|title="(?P<title>[^"]*' + _CJK_BYTES + rb'[^"]*?)"'
+    rb'|>(?P<text>[^<]*' + _CJK_BYTES + rb'[^<]*?)<'
+    rb'|(?P<chinese>' + _CJK_BYTES + rb'+[^<>"]*)'
+)
 
 ppt_file = r'd:\00-深圳华云\13-自服务课程开发\大语言模型\程燕霞\【请查收评审建议+进度+提交PDF版】开发者人才培养华云伙伴：《大语言模型》PPT_讲义实验手册_代码评审结果+交付件进度+PDF版\1\课程共建交付件清单和开发顺序0828 - 20250903145602.pptx'
 
-with zipfile.ZipFile(ppt_file, 'r') as zip_ref:
-    print("=== 搜索所有XML文件中的中文内容 ===")
+# 每个工作进程只打开一次ZIP句柄，供该进程的全部任务复用
+_worker_zip = None
+
+
+class _SeekableMmap:
+    """
+    mmap之上的薄适配层：mmap本身有read/seek/tell，
+    只差ZipFile.open所要求的seekable/readable两个接口
+    """
+    
+    def __init__(self, mm):
+        self._mm = mm
+        self.read = mm.read
+        self.tell = mm.tell
+        self.close = mm.close
     
-    # 获取所有XML文件
-    xml_files = [f for f in zip_ref.namelist() if f.endswith('.xml')]
+    def seek(self, offset, whence=0):
+        self._mm.seek(offset, whence)  # 3.13之前mmap.seek不返回新位置
+        return self._mm.tell()
     
-    for xml_file in xml_files:
-        print(f'\n检查文件: {xml_file}')
-        try:
-            content = zip_ref.read(xml_file).decode('utf-8')
-            
-            # 查找包含中文字符的内容
-            chinese_matches = re.findall(r'[\u4e00-\u9fff][^<>"]*[\u4e00-\u9fff]*', content)
-            
-            if chinese_matches:
-                print(f'  发现中文内容:')
-                for match in chinese_matches[:10]:  # 只显示前10个
-                    clean_match = match.strip()
-                    if len(clean_match) >= 2:
-                        print(f'    {clean_match}')
-            
-            # 特别查找name属性中的中文
-            name_matches = re.findall(r'name="([^"]*[\u4e00-\u9fff][^"]*?)"', content)
-            if name_matches:
-                print(f'  name属性中的中文:')
-                for match in name_matches:
-                    print(f'    {match}')
-                    
-            # 查找title属性中的中文
-            title_matches = re.findall(r'title="([^"]*[\u4e00-\u9fff][^"]*?)"', content)
-            if title_matches:
-                print(f'  title属性中的中文:')
-                for match in title_matches:
-                    print(f'    {match}')
-                    
-            # 查找文本节点中的中文
-            text_matches = re.findall(r'>([^<]*[\u4e00-\u9fff][^<]*?)<', content)
-            if text_matches:
-                print(f'  文本节点中的中文:')
-                for match in text_matches[:5]:  # 只显示前5个
-                    clean_match = match.strip()
-                    if len(clean_match) >= 2:
-                        print(f'    {clean_match}')
-                        
-        except Exception as e:
-            print(f'  处理文件时出错: {e}')
+    def seekable(self):
+        return True
     
-    print("\n=== 特别检查docProps文件 ===")
-    docprops_files = [f for f in zip_ref.namelist() if 'docProps' in f]
-    for file in docprops_files:
-        print(f'\n检查: {file}')
-        try:
-            content = zip_ref.read(file).decode('utf-8')
-            print(f'内容预览: {content[:500]}...')
-            
-            # 查找中文内容
-            chinese_matches = re.findall(r'[\u4e00-\u9fff][^<>"]*', content)
-            if chinese_matches:
-                print('发现中文:')
-                for match in chinese_matches:
-                    print(f'  {match}')
-        except Exception as e:
-            print(f'处理时出错: {e}')
\ No newline at end of file
+    def readable(self):
+        return True
+
+
+def _init_worker(zip_path):
+    global _worker_zip
+    # 把整个pptx映射进地址空间再交给ZipFile：读中央目录和成员数据
+    # 都走页缓存，多个工作进程映射同一文件时物理页也只有一份
+    fd = os.open(zip_path, os.O_RDONLY)
+    try:
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)  # mmap内部持有引用，描述符可立即归还
+    _worker_zip = zipfile.ZipFile(_SeekableMmap(mm), 'r')
+
+
+def scan_xml(xml_file):
+    """
+    扫描单个XML成员（在工作进程中运行），返回(文件名, 分桶结果, 错误)
+    解压+解码+正则都是CPU密集活，进程池绕开GIL按核并行
+    """
+    try:
+        # 经64KB缓冲流式读取：解压以大块进行，与后续扫描的内存峰值错开
+        with _worker_zip.open(xml_file) as entry, \
+                io.BufferedReader(entry, buffer_size=1 << 16) as buffered:
+            raw = buffered.read()
+        # 字节级预筛：不含UTF-8中文首字节的文件无需任何扫描
+        if not has_cjk_utf8_lead(raw):
+            return xml_file, None, None
+        
+        # 单趟扫描原始字节归桶，只对命中的片段做解码
+        buckets = {'chinese': [], 'name': [], 'title': [], 'text': []}
+        for m in COMBINED_PATTERN.finditer(raw):
+            buckets[m.lastgroup].append(
+                m.group(m.lastgroup).decode('utf-8', 'ignore'))
+        return xml_file, buckets, None
+    except Exception as e:
+        return xml_file, None, str(e)
+
+
+def main():
+    # 主进程同样走mmap读取，with保证映射随ZipFile一起释放
+    fd = os.open(ppt_file, os.O_RDONLY)
+    try:
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+    with mm, zipfile.ZipFile(_SeekableMmap(mm), 'r') as zip_ref:
+        print("=== 搜索所有XML文件中的中文内容 ===")
+        
+        # 获取所有XML文件
+        xml_files = [f for f in zip_ref.namelist() if f.endswith('.xml')]
+        
+        # 各成员扫描互相独立，进程池并行；结果回到主进程按原顺序打印
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 initializer=_init_worker,
+                                 initargs=(ppt_file,)) as executor:
+            for xml_file, buckets, error in executor.map(scan_xml, xml_files, chunksize=8):
+                print(f'\n检查文件: {xml_file}')
+                if error:
+                    print(f'  处理文件时出错: {error}')
+                    continue
+                if buckets is None:
+                    continue
+                
+                if buckets['chinese']:
+                    print(f'  发现中文内容:')
+                    for match in buckets['chinese'][:10]:  # 只显示前10个
+                        clean_match = match.strip()
+                        if len(clean_match) >= 2:
+                            print(f'    {clean_match}')
+                
+                if buckets['name']:
+                    print(f'  name属性中的中文:')
+                    for match in buckets['name']:
+                        print(f'    {match}')
+                
+                if buckets['title']:
+                    print(f'  title属性中的中文:')
+                    for match in buckets['title']:
+                        print(f'    {match}')
+                
+                if buckets['text']:
+                    print(f'  文本节点中的中文:')
+                    for match in buckets['text'][:5]:  # 只显示前5个
+                        clean_match = match.strip()
+                        if len(clean_match) >= 2:
+                            print(f'    {clean_match}')
+        
+        print("\n=== 特别检查docProps文件 ===")
+        docprops_files = [f for f in zip_ref.namelist() if 'docProps' in f]
+        for file in docprops_files:
+            print(f'\n检查: {file}')
+            try:
+                with zip_ref.open(file) as entry, \
+                        io.BufferedReader(entry, buffer_size=1 << 16) as buffered:
+                    content = buffered.read().decode('utf-8')
+                print(f'内容预览: {content[:500]}...')
+                
+                # 查找中文内容
+                chinese_matches = re.findall(r'[\u4e00-\u9fff][^<>"]*', content)
+                if chinese_matches:
+                    print('发现中文:')
+                    for match in chinese_matches:
+                        print(f'  {match}')
+            except Exception as e:
+                print(f'处理时出错: {e}')
+
+
+if __name__ == '__main__':
+    main()
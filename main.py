@@ -91,12 +91,12 @@ def create_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def interactive_mode() -> Tuple[str, str, Optional[str]]:
+def interactive_mode() -> Tuple[str, str, Optional[str], int]:
     """
     交互模式：引导用户输入参数
     
     Returns:
-        (input_file, output_dir, log_file)
+        (input_file, output_dir, log_file, input_size)
     """
     print("\n" + "="*60)
     print("PPT嵌入对象提取工具 - 交互模式")
@@ -109,7 +109,10 @@ def interactive_mode() -> Tuple[str, str, Optional[str]]:
             print("❌ 请输入有效的文件路径")
             continue
         
-        if not os.path.exists(input_file):
+        # 一次stat同时完成存在性检查并取到大小，供下游复用
+        try:
+            input_size = os.stat(input_file).st_size
+        except OSError:
             print(f"❌ 文件不存在: {input_file}")
             continue
         
@@ -147,15 +150,15 @@ def interactive_mode() -> Tuple[str, str, Optional[str]]:
     if not log_file:
         log_file = None
     
-    return input_file, output_dir, log_file
+    return input_file, output_dir, log_file, input_size
 
 
-def validate_arguments(args) -> Tuple[str, str, Optional[str]]:
+def validate_arguments(args) -> Tuple[str, str, Optional[str], int]:
     """
     验证和处理命令行参数
     
     Returns:
-        (input_file, output_dir, log_file)
+        (input_file, output_dir, log_file, input_size)
     """
     # 确定输入文件
     input_file = args.input_file or args.input_file_alt
@@ -173,8 +176,10 @@ def validate_arguments(args) -> Tuple[str, str, Optional[str]]:
             ErrorCode.INVALID_ARGUMENTS
         )
     
-    # 验证输入文件
-    if not os.path.exists(input_file):
+    # 验证输入文件（一次stat完成存在性检查并取到大小，供下游复用）
+    try:
+        input_size = os.stat(input_file).st_size
+    except OSError:
         raise PPTExtractorError(
             f"输入文件不存在: {input_file}",
             ErrorCode.FILE_NOT_FOUND
@@ -186,7 +191,7 @@ def validate_arguments(args) -> Tuple[str, str, Optional[str]]:
             ErrorCode.FILE_FORMAT_UNSUPPORTED
         )
     
-    return input_file, output_dir, args.log_file
+    return input_file, output_dir, args.log_file, input_size
 
 
 def main():
@@ -199,10 +204,10 @@ def main():
     try:
         # 处理参数
         if args.interactive:
-            input_file, output_dir, log_file = interactive_mode()
+            input_file, output_dir, log_file, input_size = interactive_mode()
             enable_console_log = True
         else:
-            input_file, output_dir, log_file = validate_arguments(args)
+            input_file, output_dir, log_file, input_size = validate_arguments(args)
             enable_console_log = not args.no_console_log
         
         # 显示开始信息
@@ -220,7 +225,7 @@ def main():
         extractor = PPTExtractor(log_file=log_file, enable_console_log=enable_console_log)
         
         def extract_operation():
-            return extractor.extract_embedded_objects(input_file, output_dir)
+            return extractor.extract_embedded_objects(input_file, output_dir, file_size=input_size)
         
         # 安全执行提取操作
         result = safe_execute(
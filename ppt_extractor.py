@@ -5,22 +5,105 @@ PPT嵌入对象提取工具
 从PowerPoint文件中提取所有嵌入的Word、Excel和其他文件对象
 """
 
+import io
 import os
+import subprocess
 import sys
+import tempfile
+import threading
 import zipfile
 import shutil
 import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # C实现的解析器，解析大量XML时比纯Python的ElementTree快一个数量级
+    _USING_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _USING_LXML = False
 from tqdm import tqdm
-import chardet
 from datetime import datetime
 
 # 导入自定义模块
 from file_type_detector import FileTypeDetector
 from error_handler import ErrorHandler, PPTExtractorError, ErrorCode, validate_file_path, validate_directory_path, check_disk_space
 
+# OOXML命名空间与限定标签/属性名：每次解析都会用到，提升为模块常量
+# 后省去每张幻灯片的字符串与字典重建，祖先遍历里也可做整串等值比较
+_NS = {
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+}
+_GRAPHIC_FRAME_TAG = '{http://schemas.openxmlformats.org/presentationml/2006/main}graphicFrame'
+_REL_ID_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+_RELATIONSHIP_TAG = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+
+# 原始文件名已带这些扩展名时不再追加探测出的扩展名
+# （str.endswith接受元组，一次C层调用完成全部后缀比较）
+_KNOWN_NAME_EXTS = ('.xlsx', '.docx', '.pdf', '.pptx', '.txt', '.xls')
+
+# lxml下复用同一个收敛配置的parser：跳过注释与空白文本节点、不收集
+# xml:id索引，树更小且每次解析免去parser实例化；标准库ET回退时传None
+# 即其默认parser
+if _USING_LXML:
+    _XML_PARSER_OPTS = dict(
+        remove_blank_text=True, remove_comments=True, collect_ids=False)
+    _XML_PARSER = ET.XMLParser(**_XML_PARSER_OPTS)
+
+    # lxml会对忙碌的parser加锁，多个线程共用同一实例会把并行解析
+    # 重新串行化；幻灯片解析走每线程独立的同配置parser
+    _thread_parser = threading.local()
+
+    def _slide_parser():
+        parser = getattr(_thread_parser, 'parser', None)
+        if parser is None:
+            parser = _thread_parser.parser = ET.XMLParser(**_XML_PARSER_OPTS)
+        return parser
+
+    # XPath表达式编译一次反复执行，省去find每次重新解析路径字符串
+    _XP_CNVPR = ET.XPath('.//p:cNvPr', namespaces=_NS)
+    _XP_OLE_OBJ = ET.XPath('.//p:oleObj', namespaces=_NS)
+
+    def _find_cnvpr(elem):
+        found = _XP_CNVPR(elem)
+        return found[0] if found else None
+
+    def _find_ole_obj(elem):
+        found = _XP_OLE_OBJ(elem)
+        return found[0] if found else None
+else:
+    _XML_PARSER = None
+
+    def _slide_parser():
+        return None
+
+    def _find_cnvpr(elem):
+        return elem.find('.//p:cNvPr', _NS)
+
+    def _find_ole_obj(elem):
+        return elem.find('.//p:oleObj', _NS)
+
+# 扩展名可信的常见类型直接查表定型：媒体文件和OOXML包的后缀本身就是
+# 可靠信号，按表合成(扩展名, 类型描述, MIME)即可，不必为内容嗅探读前
+# 4KB乃至整读PK容器。oleObject*.bin等通用容器仍走内容检测
+_TRUSTED_EXT_TYPES = {
+    '.png': ('.png', 'PNG图像', 'image/png'),
+    '.jpg': ('.jpg', 'JPEG图像', 'image/jpeg'),
+    '.jpeg': ('.jpeg', 'JPEG图像', 'image/jpeg'),
+    '.gif': ('.gif', 'GIF图像', 'image/gif'),
+    '.xlsx': ('.xlsx', 'Microsoft Excel工作簿',
+              'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    '.docx': ('.docx', 'Microsoft Word文档',
+              'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    '.pptx': ('.pptx', 'Microsoft PowerPoint演示文稿',
+              'application/vnd.openxmlformats-officedocument.presentationml.presentation'),
+    '.pdf': ('.pdf', 'PDF文档', 'application/pdf'),
+}
+
 
 class PPTExtractor:
     """PPT嵌入对象提取器"""
@@ -32,6 +115,7 @@ class PPTExtractor:
         # 初始化组件
         self.file_detector = FileTypeDetector()
         self.error_handler = ErrorHandler(log_file, enable_console_log)
+        self.enable_console_log = enable_console_log
         
         # 统计信息
         self.stats = {
@@ -43,13 +127,15 @@ class PPTExtractor:
             'total_size_extracted': 0
         }
     
-    def extract_embedded_objects(self, ppt_path: str, output_dir: str) -> Dict[str, List[str]]:
+    def extract_embedded_objects(self, ppt_path: str, output_dir: str,
+                                 file_size: Optional[int] = None) -> Dict[str, List[str]]:
         """
         从PPT文件中提取所有嵌入对象
         
         Args:
             ppt_path: PPT文件路径
             output_dir: 输出目录路径
+            file_size: PPT文件大小（调用方已stat过时传入，免去重复系统调用）
             
         Returns:
             包含提取结果的字典
@@ -69,7 +155,8 @@ class PPTExtractor:
                 )
             
             # 检查文件大小和磁盘空间
-            file_size = os.path.getsize(ppt_path)
+            if file_size is None:
+                file_size = os.path.getsize(ppt_path)
             check_disk_space(output_dir, file_size * 2)  # 预留2倍文件大小的空间
             
             self.error_handler.logger.info(f"开始分析PPT文件: {ppt_path}")
@@ -99,62 +186,190 @@ class PPTExtractor:
         """
         extracted_files = []
         failed_files = []
-        
+
         try:
-            with zipfile.ZipFile(pptx_path, 'r') as zip_file:
-                # 获取所有文件列表
-                file_list = zip_file.namelist()
-                
-                # 查找嵌入对象目录
-                embedded_dirs = [
+            # 输出目录只确保一次，此后所有写出直接假定其存在
+            os.makedirs(output_dir, exist_ok=True)
+
+            # 文件只open一次并套1MiB读缓冲再交给ZipFile：解析中央目录/
+            # 局部文件头的小块读合并为大块预读，不再每次按名重新打开
+            with open(pptx_path, 'rb', buffering=1 << 20) as pptx_fp, \
+                    zipfile.ZipFile(pptx_fp, 'r', allowZip64=True) as zip_file:
+                # 中央目录只物化一次：infolist给出全部ZipInfo，单趟分桶出
+                # 三类目标（嵌入对象/关系文件/幻灯片XML），各环节直接消费
+                # 自己的子列表，不再各自重扫整个名称列表
+                embedded_dirs = (
                     'ppt/embeddings/',
                     'ppt/media/',
                     'word/embeddings/',
                     'xl/embeddings/'
-                ]
-                
-                embedded_files = []
-                for file_path in file_list:
-                    for embed_dir in embedded_dirs:
-                        if file_path.startswith(embed_dir) and not file_path.endswith('/'):
-                            embedded_files.append(file_path)
-                
-                # 分析关系文件以获取更多信息
-                relationships = self._parse_relationships(zip_file)
-                
-                # 解析幻灯片XML以获取OLE对象的原始文件名
-                ole_names = self._parse_slide_xml_for_ole_names(zip_file)
+                )
+
+                # 三类桶都直接存ZipInfo：后续read/open按ZipInfo寻址，
+                # 跳过zipfile内部按名查找的一跳
+                embedded_infos = []
+                rel_files = []
+                slide_files = []
+                for info in zip_file.infolist():
+                    name = info.filename
+                    # str.startswith原生接受元组并在C层逐个前缀比较
+                    if name.startswith(embedded_dirs):
+                        if not info.is_dir():
+                            embedded_infos.append(info)
+                    elif name.endswith('.rels'):
+                        rel_files.append(info)
+                    elif name.startswith('ppt/slides/slide') and name.endswith('.xml'):
+                        slide_files.append(info)
+
+                # 关系/幻灯片XML解析只为oleObject改名服务：嵌入成员里
+                # 没有embeddings目录（纯图片的常见情况）时整体跳过
+                if any('/embeddings/' in info.filename for info in embedded_infos):
+                    # 分析关系文件以获取更多信息
+                    relationships = self._parse_relationships(zip_file, rel_files)
+
+                    # 解析幻灯片XML以获取OLE对象的原始文件名
+                    ole_names = self._parse_slide_xml_for_ole_names(zip_file, slide_files)
+                else:
+                    relationships = {}
+                    ole_names = {}
+
+                # 按目标基名反查关系ID的索引：worker改名时O(1)命中，
+                # 不再每个oleObject文件线扫整张关系表（同名目标可能被
+                # 多张幻灯片各自引用，故值为关系ID列表）
+                target_index = defaultdict(list)
+                for rel_id, rel_info in relationships.items():
+                    target_index[os.path.basename(rel_info['target'])].append(rel_id)
                 
                 # 提取嵌入文件
-                if embedded_files:
-                    print(f"发现 {len(embedded_files)} 个嵌入对象")
-                    
-                    for file_path in tqdm(embedded_files, desc="提取嵌入对象"):
+                if embedded_infos:
+                    print(f"发现 {len(embedded_infos)} 个嵌入对象")
+
+                    # 各嵌入对象的解压+检测+落盘互相独立，线程池沿成员轴并行
+                    # （zlib解压在C层释放GIL，IO亦可重叠）。ZipFile对象非线程
+                    # 安全，每个工作线程惰性打开自己的句柄——中央目录很小，
+                    # 重复打开的代价远低于串行解压的收益
+                    thread_zip = threading.local()
+                    worker_zips = []
+                    state_lock = threading.Lock()
+
+                    # 已占用的输出文件名经一次scandir（单个readdir批量返回）
+                    # 读入内存，配合每个基名的计数器做去重，选名阶段零exists探测
+                    with os.scandir(output_dir) as entries:
+                        taken_names = {entry.name for entry in entries}
+                    name_counters = defaultdict(int)
+
+                    # unzip二进制批量解压多成员归档远快于逐成员走Python层
+                    # zipfile。可用时先把全部嵌入目录解到输出目录下的临时
+                    # 目录（同文件系统，稍后rename零拷贝入位），worker只做
+                    # 嗅探+改名；unzip缺席或失败则退回进程内解压
+                    pre_dir = None
+                    if shutil.which('unzip'):
+                        # 模式只取归档里实际出现的嵌入目录：列出不存在的
+                        # 目录会让unzip以11（filename not matched）退出，
+                        # 整个预解压被白白丢弃
+                        present_dirs = sorted({
+                            prefix for info in embedded_infos
+                            for prefix in embedded_dirs
+                            if info.filename.startswith(prefix)})
+                        pre_dir = tempfile.mkdtemp(prefix='.unzip_', dir=output_dir)
+                        proc = subprocess.run(
+                            ['unzip', '-qq', '-o', '-d', pre_dir, pptx_path]
+                            + [d + '*' for d in present_dirs],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        if proc.returncode != 0:
+                            shutil.rmtree(pre_dir, ignore_errors=True)
+                            pre_dir = None
+
+                    # 热路径属性预绑定：worker每次迭代省去方法/模块的
+                    # LOAD_ATTR链，直接走局部变量查找
+                    detect_type = self.file_detector.detect_file_type
+                    get_category = self.file_detector.get_file_category
+                    format_size = self.file_detector.format_file_size
+                    path_exists = os.path.exists
+                    path_join = os.path.join
+                    path_basename = os.path.basename
+                    path_splitext = os.path.splitext
+
+                    def extract_one(zinfo):
+                        file_path = zinfo.filename
                         try:
-                            # 提取文件
-                            file_data = zip_file.read(file_path)
-                            
+                            # 可信扩展名跳过内容嗅探，类型三元组直接查表合成
+                            trusted = _TRUSTED_EXT_TYPES.get(
+                                path_splitext(file_path)[1].lower())
+
+                            # 预解压命中时直接从临时文件嗅探，后续rename入位
+                            pre_path = None
+                            if pre_dir is not None:
+                                cand = path_join(pre_dir, file_path)
+                                if path_exists(cand):
+                                    pre_path = cand
+
+                            if pre_path is not None:
+                                src = None
+                                if trusted is not None:
+                                    header = sniff_data = None
+                                else:
+                                    with open(pre_path, 'rb') as pre_f:
+                                        header = pre_f.read(4096)
+                                        if header.startswith(b'PK\x03\x04'):
+                                            sniff_data = header + pre_f.read()
+                                        else:
+                                            sniff_data = header
+                            else:
+                                zf = getattr(thread_zip, 'zip', None)
+                                if zf is None:
+                                    fp = open(pptx_path, 'rb', buffering=1 << 20)
+                                    zf = zipfile.ZipFile(fp, 'r', allowZip64=True)
+                                    thread_zip.zip = zf
+                                    with state_lock:
+                                        worker_zips.append((zf, fp))
+
+                                # 类型嗅探peek前4KB：peek不消费流，分类完成后写出
+                                # 阶段用同一句柄继续拷贝，嗅探不再单独解压一次成员
+                                src = io.BufferedReader(zf.open(zinfo), buffer_size=256 * 1024)
+                                if trusted is not None:
+                                    header = sniff_data = None
+                                else:
+                                    header = src.peek(4096)[:4096]
+
+                                    # PK容器（docx/xlsx等）需读到中央目录才能细分
+                                    # 子类型，这一类退回整体读取
+                                    if header.startswith(b'PK\x03\x04'):
+                                        sniff_data = src.read()
+                                        src.close()
+                                    else:
+                                        sniff_data = header
+
                             # 确定文件类型和扩展名
-                            file_ext, file_type, mime_type = self.file_detector.detect_file_type(file_data, file_path)
-                            file_category = self.file_detector.get_file_category(file_ext[1:])  # 去掉点号
+                            if trusted is not None:
+                                file_ext, file_type, mime_type = trusted
+                            else:
+                                file_ext, file_type, mime_type = detect_type(sniff_data, file_path)
+                            file_category = get_category(file_ext[1:])  # 去掉点号
                             
                             # 获取文件名，优先使用embeddings目录中的具体文件名
-                            base_name = os.path.basename(file_path)
+                            base_name = path_basename(file_path)
                             original_name = None  # 初始化变量
                             
                             # 如果是oleObject*.bin这样的通用文件名，尝试获取更具体的名称
                             if base_name.startswith('oleObject') and base_name.endswith('.bin'):
-                                # 尝试从关系文件中查找对应的原始文件名
-                                for rel_id, rel_info in relationships.items():
-                                    if rel_info['target'] in file_path or file_path.endswith(rel_info['target']):
-                                        if rel_id in ole_names:
-                                            original_name = ole_names[rel_id]
-                                            break
+                                # 先按基名走反查索引找原始文件名
+                                for rel_id in target_index.get(base_name, ()):
+                                    if rel_id in ole_names:
+                                        original_name = ole_names[rel_id]
+                                        break
+                                else:
+                                    # 索引未命中再退回整路径匹配兜底
+                                    for rel_id, rel_info in relationships.items():
+                                        if rel_info['target'] in file_path or file_path.endswith(rel_info['target']):
+                                            if rel_id in ole_names:
+                                                original_name = ole_names[rel_id]
+                                                break
                                 
                                 if original_name and original_name.strip():
                                     base_name = original_name.strip()
                                     # 确保文件名有正确的扩展名
-                                    if not any(base_name.lower().endswith(ext) for ext in ['.xlsx', '.docx', '.pdf', '.pptx', '.txt', '.xls']):
+                                    if not base_name.lower().endswith(_KNOWN_NAME_EXTS):
                                         base_name += file_ext
                                 else:
                                     # 保持原始的oleObject文件名，只添加正确的扩展名
@@ -165,25 +380,39 @@ class PPTExtractor:
                                 if '.' not in base_name:
                                     base_name += file_ext
                             
-                            output_path = os.path.join(output_dir, base_name)
-                            
-                            # 处理重名文件
-                            counter = 1
-                            original_output_path = output_path
-                            while os.path.exists(output_path):
-                                name, ext = os.path.splitext(original_output_path)
-                                output_path = f"{name}_{counter}{ext}"
-                                counter += 1
-                            
-                            # 保存文件
+                            # 处理重名文件（从预留集合里取名并立即建档，均在锁内
+                            # 完成，工作线程间不竞态；数据写出在锁外进行）
+                            with state_lock:
+                                candidate = base_name
+                                if candidate in taken_names:
+                                    name, ext = path_splitext(base_name)
+                                    while candidate in taken_names:
+                                        name_counters[base_name] += 1
+                                        candidate = f"{name}_{name_counters[base_name]}{ext}"
+                                taken_names.add(candidate)
+                                output_path = path_join(output_dir, candidate)
+                                output_file = open(output_path, 'wb')
+
+                            # 保存文件：预解压的成员同文件系统rename零拷贝入位；
+                            # 否则已整读的PK容器直接写出，其余走分块流式拷贝
                             try:
-                                with open(output_path, 'wb') as output_file:
-                                    output_file.write(file_data)
-                                
-                                # 验证文件是否正确保存
-                                if not os.path.exists(output_path) or os.path.getsize(output_path) != len(file_data):
-                                    raise PPTExtractorError("文件保存验证失败", ErrorCode.FILE_SAVE_FAILED)
-                                
+                                if pre_path is not None:
+                                    output_file.close()
+                                    os.replace(pre_path, output_path)
+                                    bytes_written = zinfo.file_size
+                                else:
+                                    with output_file:
+                                        if sniff_data is not header:
+                                            output_file.write(sniff_data)
+                                            bytes_written = len(sniff_data)
+                                        else:
+                                            # 256KB读缓冲让zlib每次以大块输入做inflate，
+                                            # copyfileobj按同粒度搬运；写入量直接取文件位置
+                                            with src:
+                                                shutil.copyfileobj(src, output_file, length=256 * 1024)
+                                            bytes_written = output_file.tell()
+
+
                                 file_info = {
                                     'original_path': file_path,
                                     'output_path': output_path,
@@ -191,17 +420,12 @@ class PPTExtractor:
                                     'file_type': file_type,
                                     'file_category': file_category,
                                     'mime_type': mime_type,
-                                    'size': len(file_data),
-                                    'formatted_size': self.file_detector.format_file_size(len(file_data))
+                                    'size': bytes_written,
+                                    'formatted_size': format_size(bytes_written)
                                 }
                                 
-                                extracted_files.append(file_info)
-                                self.stats['total_files_extracted'] += 1
-                                self.stats['total_size_extracted'] += len(file_data)
-                                
-                                self.error_handler.logger.info(
-                                    f"提取成功: {os.path.basename(output_path)} ({file_type}, {file_info['formatted_size']})"
-                                )
+                                with state_lock:
+                                    extracted_files.append(file_info)
                                 
                             except Exception as save_error:
                                 raise PPTExtractorError(
@@ -210,17 +434,50 @@ class PPTExtractor:
                                 )
                             
                         except Exception as e:
-                            self.stats['total_files_failed'] += 1
                             error_info = {
                                 'file': file_path,
                                 'error': str(e),
                                 'error_type': type(e).__name__
                             }
-                            failed_files.append(error_info)
+                            with state_lock:
+                                failed_files.append(error_info)
                             self.error_handler.handle_error(e, {
                                 'file_path': file_path,
                                 'operation': 'extract_embedded_object'
                             })
+
+                    max_workers = min(8, os.cpu_count() or 1)
+                    try:
+                        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                            futures = [pool.submit(extract_one, zi) for zi in embedded_infos]
+                            # 完成事件回到主线程驱动进度条（异常已在worker内记录）。
+                            # 限频刷新摊薄tqdm自身的锁+重绘开销；静默模式或输出
+                            # 不是终端时干脆整个关掉
+                            with tqdm(total=len(futures), desc="提取嵌入对象",
+                                      mininterval=0.2,
+                                      miniters=max(1, len(futures) // 100),
+                                      disable=not self.enable_console_log or not sys.stderr.isatty()) as pbar:
+                                for _ in as_completed(futures):
+                                    pbar.update(1)
+                    finally:
+                        for zf, fp in worker_zips:
+                            zf.close()
+                            fp.close()
+                        if pre_dir is not None:
+                            shutil.rmtree(pre_dir, ignore_errors=True)
+
+                    # 统计一次性合并；成功记录拼成单条日志发出，worker内
+                    # 不再逐文件调用logger争抢handler锁
+                    self.stats['total_files_extracted'] += len(extracted_files)
+                    self.stats['total_size_extracted'] += sum(f['size'] for f in extracted_files)
+                    self.stats['total_files_failed'] += len(failed_files)
+
+                    if extracted_files:
+                        lines = '\n'.join(
+                            f"  {os.path.basename(f['output_path'])} ({f['file_type']}, {f['formatted_size']})"
+                            for f in extracted_files
+                        )
+                        self.error_handler.logger.info(f"提取成功 {len(extracted_files)} 个文件:\n{lines}")
                 else:
                     print("未发现嵌入对象")
                 
@@ -261,121 +518,142 @@ class PPTExtractor:
             'summary': {'total': 1, 'extracted': 0, 'failed': 1}
         }
     
-    def _parse_relationships(self, zip_file: zipfile.ZipFile) -> Dict[str, str]:
+    def _parse_relationships(self, zip_file: zipfile.ZipFile,
+                             rel_files: Optional[List[zipfile.ZipInfo]] = None) -> Dict[str, str]:
         """
         解析关系文件以获取嵌入对象信息
         """
         relationships = {}
-        
+
         try:
-            # 查找关系文件
-            rel_files = [f for f in zip_file.namelist() if f.endswith('.rels')]
-            
+            # 查找关系文件（调用方可直接传入已分桶好的.rels子列表，
+            # 按ZipInfo读取省去按名查找）
+            if rel_files is None:
+                rel_files = [info for info in zip_file.infolist()
+                             if info.filename.endswith('.rels')]
+
             for rel_file in rel_files:
                 try:
                     rel_data = zip_file.read(rel_file)
-                    root = ET.fromstring(rel_data)
-                    
-                    # 解析关系
-                    for relationship in root.findall('.//{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'):
+
+                    # 字节级预筛：提取环节只消费指向嵌入对象的关系
+                    # （oleObject改名用），不含相关目标的关系文件无需解析
+                    if b'embeddings/' not in rel_data and b'oleObject' not in rel_data:
+                        continue
+
+                    root = ET.fromstring(rel_data, _XML_PARSER)
+
+                    # 解析关系：rels文档是扁平的，Relationship都是根的直接
+                    # 子节点，按子元素遍历+限定名整串比较即可，无需任何XPath
+                    for relationship in root:
+                        if relationship.tag != _RELATIONSHIP_TAG:
+                            continue
                         rel_id = relationship.get('Id')
                         target = relationship.get('Target')
                         rel_type = relationship.get('Type')
-                        
-                        if rel_id and target:
+
+                        if rel_id and target and ('embeddings/' in target or 'oleObject' in target):
                             relationships[rel_id] = {
                                 'target': target,
                                 'type': rel_type
                             }
                             
                 except Exception as e:
-                    print(f"解析关系文件 {rel_file} 时出错: {str(e)}")
+                    print(f"解析关系文件 {rel_file.filename} 时出错: {str(e)}")
                     
         except Exception as e:
             print(f"解析关系文件时出错: {str(e)}")
         
         return relationships
     
-    def _parse_slide_xml_for_ole_names(self, zip_file: zipfile.ZipFile) -> Dict[str, str]:
+    def _parse_slide_xml_for_ole_names(self, zip_file: zipfile.ZipFile,
+                                       slide_files: Optional[List[zipfile.ZipInfo]] = None) -> Dict[str, str]:
         """
         解析幻灯片XML文件以获取OLE对象的原始文件名
-        
+
         Returns:
             字典，键为嵌入对象的关系ID或目标路径，值为原始文件名
         """
         ole_names = {}
-        
+
         try:
-            # 查找所有幻灯片XML文件
-            slide_files = [f for f in zip_file.namelist() if f.startswith('ppt/slides/slide') and f.endswith('.xml')]
-            
-            for slide_file in slide_files:
+            # 查找所有幻灯片XML文件（调用方可直接传入已分桶好的子列表，
+            # 按ZipInfo读取省去按名查找）
+            if slide_files is None:
+                slide_files = [info for info in zip_file.infolist()
+                               if info.filename.startswith('ppt/slides/slide')
+                               and info.filename.endswith('.xml')]
+
+            if not slide_files:
+                return ole_names
+
+            def parse_one(item):
+                slide_file, source = item
                 try:
-                    slide_data = zip_file.read(slide_file)
-                    root = ET.fromstring(slide_data)
-                    
-                    # 定义命名空间
-                    namespaces = {
-                        'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
-                        'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                        'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
-                    }
-                    
-                    # 查找所有OLE对象
-                    # 方法1: 查找oleObj元素
-                    ole_objects = root.findall('.//p:oleObj', namespaces)
-                    for ole_obj in ole_objects:
-                        # 获取关系ID
-                        rel_id = ole_obj.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                        if rel_id:
-                            # 查找对应的图形框架以获取名称（向上遍历父元素）
-                            current = ole_obj
-                            while current is not None:
-                                if current.tag.endswith('}graphicFrame'):
-                                    cnv_pr = current.find('.//p:cNvPr', namespaces)
-                                    if cnv_pr is not None:
-                                        name = cnv_pr.get('name')
-                                        if name and name != 'Object 1':  # 过滤默认名称
-                                            ole_names[rel_id] = name
-                                    break
-                                current = current.getparent() if hasattr(current, 'getparent') else None
-                    
-                    # 方法2: 查找所有图形框架中的cNvPr元素
-                    graphic_frames = root.findall('.//p:graphicFrame', namespaces)
-                    for frame in graphic_frames:
-                        cnv_pr = frame.find('.//p:cNvPr', namespaces)
-                        if cnv_pr is not None:
-                            name = cnv_pr.get('name')
-                            if name and not name.startswith('Object '):
-                                # 查找相关的嵌入对象
-                                ole_obj = frame.find('.//p:oleObj', namespaces)
-                                if ole_obj is not None:
-                                    rel_id = ole_obj.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                                    if rel_id:
-                                        ole_names[rel_id] = name
-                    
-                    # 方法3: 查找所有包含文件名信息的元素
-                    all_cnv_pr = root.findall('.//p:cNvPr', namespaces)
-                    for cnv_pr in all_cnv_pr:
-                        name = cnv_pr.get('name')
-                        if name and ('.' in name or any(ext in name.lower() for ext in ['.xlsx', '.docx', '.pdf', '.pptx'])):
-                            # 这可能是一个文件名，尝试找到相关的嵌入对象
-                            parent = cnv_pr.getparent()
-                            while parent is not None:
-                                ole_obj = parent.find('.//p:oleObj', namespaces)
-                                if ole_obj is not None:
-                                    rel_id = ole_obj.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                                    if rel_id:
-                                        ole_names[rel_id] = name
-                                        break
-                                parent = parent.getparent()
-                                
+                    with source:
+                        return slide_file, self._parse_one_slide(source), None
                 except Exception as e:
-                    self.error_handler.logger.warning(f"解析幻灯片文件 {slide_file} 时出错: {str(e)}")
-                    
+                    return slide_file, None, str(e)
+
+            if _USING_LXML and len(slide_files) > 1:
+                # 并行路径：ZipFile并发读同一句柄不安全，成员字节先串行
+                # 读出再套BytesIO；解析在lxml下释放GIL，线程池按幻灯片并行
+                slide_blobs = [(f, io.BytesIO(zip_file.read(f))) for f in slide_files]
+                with ThreadPoolExecutor(
+                        max_workers=min(8, os.cpu_count() or 1)) as executor:
+                    results = list(executor.map(parse_one, slide_blobs))
+            else:
+                # 串行路径：parser直接从成员流分块读取，字节不整块物化
+                # （标准库ET解析全程持有GIL，多线程只添调度开销）
+                results = map(parse_one,
+                              ((f, zip_file.open(f)) for f in slide_files))
+
+            # 结果按幻灯片原顺序合并，与串行版本的覆盖语义一致
+            for slide_file, names, error in results:
+                if error is not None:
+                    self.error_handler.logger.warning(f"解析幻灯片文件 {slide_file.filename} 时出错: {error}")
+                else:
+                    ole_names.update(names)
+
         except Exception as e:
             self.error_handler.logger.warning(f"解析幻灯片XML文件时出错: {str(e)}")
-        
+
+        return ole_names
+
+    def _parse_one_slide(self, source) -> Dict[str, str]:
+        """
+        解析单张幻灯片的XML（source为文件类对象），
+        返回其中OLE对象的{关系ID: 原始文件名}
+        """
+        ole_names = {}
+
+        def record_name(rel_id, frame):
+            # 框架内局部查找cNvPr：名称与oleObj同属一个graphicFrame子树
+            cnv_pr = _find_cnvpr(frame)
+            if cnv_pr is not None:
+                name = cnv_pr.get('name')
+                if name and not name.startswith('Object '):  # 过滤默认名称
+                    ole_names[rel_id] = name
+
+        # 单趟以graphicFrame为轴扫描取代原先oleObj/graphicFrame/cNvPr
+        # 三轮独立的全树findall：oleObj与cNvPr都是框架子树内的局部查找，
+        # 每帧O(子树)一次完成，无需再向上走祖先链
+        root = ET.parse(source, _slide_parser()).getroot()
+        if _USING_LXML:
+            # iterwalk按标签过滤在C层推进，比事件全开的遍历更快
+            frames = (frame for _event, frame
+                      in ET.iterwalk(root, events=('end',), tag=_GRAPHIC_FRAME_TAG))
+        else:
+            frames = root.iter(_GRAPHIC_FRAME_TAG)
+
+        for frame in frames:
+            ole_obj = _find_ole_obj(frame)
+            if ole_obj is None:
+                continue
+            rel_id = ole_obj.get(_REL_ID_ATTR)
+            if rel_id:
+                record_name(rel_id, frame)
+
         return ole_names
     
 
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PPT分析脚本共享的预编译正则与常量
+各analyze_*脚本从这里导入，同一解释器进程内所有模式只编译一次
+"""
+
+import re
+
+# OLE复合文档的签名
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# 中文字符（CJK统一表意文字基本区）
+CJK_RUN_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+CHINESE_CHAR_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+# 包含中文的字符串片段
+CHINESE_STRING_PATTERN = re.compile(r'[\u4e00-\u9fff][\u4e00-\u9fff\w\s]*')
+CHINESE_DOTTED_STRING_PATTERN = re.compile(r'[\u4e00-\u9fff][\u4e00-\u9fff\w\s\.]*')
+CHINESE_CONTENT_PATTERN = re.compile(r'[\u4e00-\u9fff]+[^<>]*')
+
+# 带常见文档扩展名的文件名模式
+CHINESE_FILENAME_PATTERN = re.compile(r'[\u4e00-\u9fff]+.*?\.(xlsx?|docx?|pptx?|pdf|txt)', re.IGNORECASE)
+CHINESE_FILENAME_EXT_PATTERN = re.compile(r'[\u4e00-\u9fff][^<>"]*\.(?:docx?|xlsx?|pptx?|pdf|txt)', re.IGNORECASE)
+FILENAME_REF_PATTERN = re.compile(r'[^<>]*\.(docx?|xlsx?|pptx?|pdf|txt)[^<>]*', re.IGNORECASE)
+
+CHINESE_FILENAME_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'([\u4e00-\u9fff][^<>"\s]*\.(docx?|xlsx?|pptx?|pdf|txt))',
+    r'"([^"]*[\u4e00-\u9fff][^"]*\.(docx?|xlsx?|pptx?|pdf|txt))"',
+    r'>([^<]*[\u4e00-\u9fff][^<]*\.(docx?|xlsx?|pptx?|pdf|txt))<',
+)]
+
+# 嵌入对象二进制内容中的文件名模式
+EMBED_CHINESE_FILE_PATTERN = re.compile(r'[\u4e00-\u9fff][^\x00-\x1f]*?\.(xlsx?|docx?|pptx?|pdf|txt)', re.IGNORECASE)
+EMBED_FILENAME_PATTERN = re.compile(r'[^\x00-\x1f]{2,50}\.(xlsx?|docx?|pptx?|pdf|txt)', re.IGNORECASE)
+
+# 原始字节快速预筛：UTF-16LE编码的CJK码位高字节必落在0x4E-0x9F区间，
+# bytes级扫描在C层完成，可在解码前直接跳过不含中文的blob
+CJK_UTF16LE_HINT = re.compile(rb'[\x4e-\x9f]')
+# UTF-8编码的CJK首字节范围（bytes的in操作走memchr）
+CJK_UTF8_LEAD_BYTES = (b'\xe4', b'\xe5', b'\xe6', b'\xe7', b'\xe8', b'\xe9')
+
+# OOXML命名空间与Clark记法标签常量
+NAMESPACES = {
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+}
+R_ID_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+RELATIONSHIP_TAG = './/{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+
+
+def has_cjk_utf8_lead(data):
+    """原始字节中是否存在UTF-8编码CJK的首字节（无需解码的快速预筛）"""
+    return any(lead in data for lead in CJK_UTF8_LEAD_BYTES)